@@ -0,0 +1,166 @@
+"""
+Exportação colunar (Parquet ou Arrow IPC) do banco de questões do ENEM para análises.
+
+As tabelas são gravadas em lotes (record batches) diretamente a partir do cursor do SQLite, sem
+carregar o banco em memória, e particionadas por ano e disciplina no estilo Hive
+(`<tabela>/year=2023/discipline=matematica/part-0.parquet`), o formato lido por pyarrow.dataset,
+DuckDB, Spark e pandas.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # dependência opcional
+    pyarrow = None
+
+
+# Número de linhas por lote gravado
+EXPORT_BATCH_SIZE = 10000
+
+FILE_FORMATS = ('parquet', 'arrow')
+
+
+def export_schemas() -> Dict[str, 'pyarrow.Schema']:
+    """Esquemas das tabelas exportadas (sem as colunas de partição year e discipline)."""
+    if pyarrow is None:
+        raise RuntimeError("O pacote 'pyarrow' é necessário para a exportação colunar (pip install pyarrow)")
+    
+    return {
+        'questions': pyarrow.schema([
+            ('id', pyarrow.int64()),
+            ('index', pyarrow.int32()),
+            ('title', pyarrow.string()),
+            ('language', pyarrow.string()),
+            ('context', pyarrow.string()),
+            ('alternatives_introduction', pyarrow.string()),
+            ('correct_alternative', pyarrow.string()),
+        ]),
+        'alternatives': pyarrow.schema([
+            ('question_id', pyarrow.int64()),
+            ('letter', pyarrow.string()),
+            ('text', pyarrow.string()),
+            ('file_path', pyarrow.string()),
+            ('is_correct', pyarrow.bool_()),
+        ]),
+        'files': pyarrow.schema([
+            ('question_id', pyarrow.int64()),
+            ('file_path', pyarrow.string()),
+        ]),
+    }
+
+
+def to_array(values: list, type: 'pyarrow.DataType') -> 'pyarrow.Array':
+    """Converte uma coluna lida do SQLite (booleanos são gravados como 0 e 1) para Arrow."""
+    if pyarrow.types.is_boolean(type):
+        return pyarrow.array(values, type=pyarrow.int8()).cast(type)
+    return pyarrow.array(values, type=type)
+
+
+class PartitionedWriter:
+    def __init__(self, output_path: str, table: str, schema: 'pyarrow.Schema',
+                 file_format: str = "parquet", batch_size: int = EXPORT_BATCH_SIZE):
+        """
+        Inicializa o gravador de uma tabela particionada por ano e disciplina.
+        
+        A pasta da tabela é recriada, para que partições de exportações anteriores não se misturem
+        com as novas.
+        
+        Args:
+            output_path: Pasta da exportação
+            table: Nome da tabela (subpasta de output_path)
+            schema: Esquema das colunas gravadas
+            file_format: 'parquet' (compressão zstd) ou 'arrow' (Arrow IPC)
+            batch_size: Número de linhas por lote
+        """
+        if pyarrow is None:
+            raise RuntimeError("O pacote 'pyarrow' é necessário para a exportação colunar (pip install pyarrow)")
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Formato de arquivo inválido: {file_format} (use 'parquet' ou 'arrow')")
+        
+        self.path = Path(output_path) / table
+        self.schema = schema
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.rows = 0
+        
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        
+        self._partition = None
+        self._writer = None
+        self._columns = [[] for _ in schema]
+        # Arquivos já gravados por partição (uma partição revisitada ganha um novo arquivo)
+        self._parts = {}
+    
+    def write_rows(self, rows: Iterable[tuple]) -> int:
+        """
+        Grava linhas no formato (ano, disciplina, *colunas do esquema).
+        
+        As linhas devem vir agrupadas por (ano, disciplina), como em um ORDER BY dessas colunas.
+        
+        Returns:
+            Número de linhas gravadas
+        """
+        written = 0
+        columns = self._columns
+        
+        for row in rows:
+            partition = (row[0], row[1])
+            if partition != self._partition:
+                self.flush()
+                self.open_partition(partition)
+            
+            for column, value in zip(columns, row[2:]):
+                column.append(value)
+            written += 1
+            
+            if len(columns[0]) >= self.batch_size:
+                self.flush()
+        
+        self.rows += written
+        return written
+    
+    def open_partition(self, partition: tuple):
+        """Fecha o arquivo da partição anterior e abre o da nova."""
+        if self._writer is not None:
+            self._writer.close()
+        
+        year, discipline = partition
+        directory = self.path / f"year={year}" / f"discipline={discipline or 'sem-disciplina'}"
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        part = self._parts.get(partition, 0)
+        self._parts[partition] = part + 1
+        path = directory / f"part-{part}.{self.file_format}"
+        
+        if self.file_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(str(path), self.schema, compression='zstd')
+        else:
+            self._writer = pyarrow.ipc.new_file(str(path), self.schema)
+        self._partition = partition
+    
+    def flush(self):
+        """Grava as linhas acumuladas como um lote."""
+        if not self._columns[0]:
+            return
+        
+        batch = pyarrow.RecordBatch.from_arrays(
+            [to_array(values, field.type) for values, field in zip(self._columns, self.schema)],
+            schema=self.schema
+        )
+        self._writer.write_batch(batch)
+        for values in self._columns:
+            values.clear()
+    
+    def close(self):
+        """Grava o último lote e fecha o arquivo aberto."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._partition = None
@@ -3,15 +3,158 @@
 Script para extrair questões do ENEM da pasta quiz-items e armazenar em banco de dados SQLite.
 """
 
+import hashlib
+import html
 import json
 import os
 import sqlite3
 import requests
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from similarity_index import find_similar
+from question_validation import VALIDATION_VERSION, validate_question
+from text_compression import COMPRESSED_DATABASE_PATH, TextCompressor, compress_copy, decode_text
+
+
+# Versão do renderizador de HTML. Incrementar força a re-renderização de todas as questões.
+HTML_RENDER_VERSION = 2
+
+# Os IDs das questões de cada shard anual começam em ano * SHARD_ID_BLOCK, mantendo-os únicos entre shards.
+SHARD_ID_BLOCK = 1000000
+
+_ESCAPED_CHAR_PATTERN = re.compile(r'\\([\\`*_{}\[\]()#+\-.!$|>~])')
+_PLACEHOLDER_PATTERN = re.compile('\x00(\\d+)\x00')
+_IMAGE_PATTERN = re.compile(r'!\[([^\]]*)\]\(([^)\s]+)[^)]*\)')
+_LINK_PATTERN = re.compile(r'\[([^\]]+)\]\(([^)\s]+)[^)]*\)')
+_BOLD_PATTERN = re.compile(r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1')
+_ITALIC_STAR_PATTERN = re.compile(r'(?<![\w*])\*(?=\S)(.+?)(?<=\S)\*(?![\w*])')
+_ITALIC_UNDERSCORE_PATTERN = re.compile(r'(?<![\w_])_(?=\S)(.+?)(?<=\S)_(?![\w_])')
+_HEADER_PATTERN = re.compile(r'^(#{1,6})\s+(.*)$')
+_UNORDERED_ITEM_PATTERN = re.compile(r'^\s*[*+-]\s+(.*)$')
+_ORDERED_ITEM_PATTERN = re.compile(r'^\s*\d+\.\s+(.*)$')
+_QUOTE_PATTERN = re.compile(r'^\s*>\s?(.*)$')
+
+
+def _safe_url(url: str) -> Optional[str]:
+    """Retorna a URL escapada para atributo HTML, ou None se o esquema não for permitido."""
+    # O esquema é verificado com as entidades decodificadas (ex.: &#106;avascript: ou javascript&colon;),
+    # como faria um cliente que renderizasse a URL novamente
+    decoded = url
+    while html.unescape(decoded) != decoded:
+        decoded = html.unescape(decoded)
+    scheme = urlparse(decoded).scheme.lower()
+    if scheme not in ('', 'http', 'https'):
+        return None
+    return html.escape(url, quote=True)
+
+
+def render_inline_markdown(text: str) -> str:
+    """
+    Renderiza a marcação inline (imagens, links, negrito e itálico) de um trecho markdown.
+    
+    Todo o texto é escapado antes da conversão, portanto HTML bruto presente no
+    markdown é exibido como texto e nunca interpretado.
+    """
+    stash = []
+    
+    def keep(fragment: str) -> str:
+        stash.append(fragment)
+        return f'\x00{len(stash) - 1}\x00'
+    
+    # O caractere NUL delimita os fragmentos guardados e não pode vir do próprio texto
+    text = text.replace('\x00', '')
+    text = _ESCAPED_CHAR_PATTERN.sub(lambda m: keep(html.escape(m.group(1))), text)
+    text = html.escape(text, quote=False)
+    
+    def replace_image(match):
+        alt = html.escape(html.unescape(match.group(1)), quote=True)
+        src = _safe_url(html.unescape(match.group(2)))
+        if src is None:
+            return keep(alt)
+        return keep(f'<img src="{src}" alt="{alt}">')
+    
+    def replace_link(match):
+        href = _safe_url(html.unescape(match.group(2)))
+        if href is None:
+            return match.group(1)
+        return keep(f'<a href="{href}" rel="noopener noreferrer">') + match.group(1) + keep('</a>')
+    
+    text = _IMAGE_PATTERN.sub(replace_image, text)
+    text = _LINK_PATTERN.sub(replace_link, text)
+    text = _BOLD_PATTERN.sub(r'<strong>\2</strong>', text)
+    text = _ITALIC_STAR_PATTERN.sub(r'<em>\1</em>', text)
+    text = _ITALIC_UNDERSCORE_PATTERN.sub(r'<em>\1</em>', text)
+    
+    # Fragmentos guardados podem conter outros marcadores (ex.: link com escape)
+    while _PLACEHOLDER_PATTERN.search(text):
+        text = _PLACEHOLDER_PATTERN.sub(lambda m: stash[int(m.group(1))], text)
+    return text
+
+
+def render_markdown_html(text: Optional[str]) -> Optional[str]:
+    """
+    Converte o markdown usado nas questões do ENEM em HTML sanitizado.
+    
+    Suporta parágrafos, quebras de linha, títulos, citações, listas e a marcação
+    inline de render_inline_markdown.
+    
+    Args:
+        text: Texto em markdown
+    
+    Returns:
+        HTML gerado, ou None se o texto for None
+    """
+    if text is None:
+        return None
+    
+    blocks = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        lines = [line for line in block.split('\n') if line.strip()]
+        if not lines:
+            continue
+        
+        header = _HEADER_PATTERN.match(lines[0])
+        if header and len(lines) == 1:
+            level = len(header.group(1))
+            blocks.append(f'<h{level}>{render_inline_markdown(header.group(2))}</h{level}>')
+        elif all(_QUOTE_PATTERN.match(line) for line in lines):
+            inner = '<br>\n'.join(render_inline_markdown(_QUOTE_PATTERN.match(line).group(1)) for line in lines)
+            blocks.append(f'<blockquote><p>{inner}</p></blockquote>')
+        elif all(_UNORDERED_ITEM_PATTERN.match(line) for line in lines):
+            items = ''.join(f'<li>{render_inline_markdown(_UNORDERED_ITEM_PATTERN.match(line).group(1))}</li>' for line in lines)
+            blocks.append(f'<ul>{items}</ul>')
+        elif all(_ORDERED_ITEM_PATTERN.match(line) for line in lines):
+            items = ''.join(f'<li>{render_inline_markdown(_ORDERED_ITEM_PATTERN.match(line).group(1))}</li>' for line in lines)
+            blocks.append(f'<ol>{items}</ol>')
+        else:
+            blocks.append('<p>' + '<br>\n'.join(render_inline_markdown(line) for line in lines) + '</p>')
+    
+    return '\n'.join(blocks)
+
+
+def _render_question_html(job: Tuple) -> Tuple:
+    """Renderiza o HTML de uma questão e de suas alternativas (executado em processos filhos)."""
+    question_id, context, introduction, alternatives, content_hash = job
+    return (
+        question_id,
+        render_markdown_html(context),
+        render_markdown_html(introduction),
+        [(alt_id, render_markdown_html(text)) for alt_id, text in alternatives],
+        content_hash
+    )
+
 
 class EnemQuestionExtractor:
     def __init__(self, db_path: str = "enem_questions.db"):
@@ -26,12 +169,23 @@ class EnemQuestionExtractor:
         # Pasta para salvar as imagens baixadas
         self.images_path = Path("images")
         self.images_path.mkdir(exist_ok=True)
+        # Compressor do banco (None se o banco não está comprimido), carregado por load_compressor
+        self.compressor = None
+        # IDs do banco publicado por (ano, índice, idioma), reaproveitados ao construir um snapshot
+        self.preserved_ids = {}
+        # Se True, write_question grava o HTML junto com a questão (modo de observação); nas
+        # extrações completas ele é renderizado depois, em paralelo, por render_html_contents
+        self.render_inline = True
     
     def create_database(self):
         """Cria as tabelas do banco de dados."""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # Modo WAL (gravado no arquivo): leitores não são bloqueados pelas escritas do modo de
+        # observação nem pela publicação de snapshots
+        cursor.execute('PRAGMA journal_mode = WAL')
+        
         # Tabela de exames
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS exams (
@@ -87,7 +241,7 @@ class EnemQuestionExtractor:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 question_id INTEGER NOT NULL,
                 letter TEXT NOT NULL,
-                text TEXT NOT NULL,
+                text TEXT,
                 file_path TEXT,
                 is_correct BOOLEAN NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -106,10 +260,80 @@ class EnemQuestionExtractor:
             )
         ''')
         
+        # Colunas adicionadas após a criação original do esquema
+        self.ensure_column(cursor, 'questions', 'context_html', 'TEXT')
+        self.ensure_column(cursor, 'questions', 'alternatives_introduction_html', 'TEXT')
+        self.ensure_column(cursor, 'questions', 'html_hash', 'TEXT')
+        self.ensure_column(cursor, 'alternatives', 'text_html', 'TEXT')
+        # Alternativas só com imagem não têm texto
+        self.ensure_nullable(cursor, 'alternatives', 'text')
+        
+        # Tabela de questões semelhantes (índice "mais como esta")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS similar_questions (
+                question_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                similar_question_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (question_id, rank),
+                FOREIGN KEY (question_id) REFERENCES questions (id),
+                FOREIGN KEY (similar_question_id) REFERENCES questions (id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Arquivos de questões inválidas, com os erros encontrados na validação
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quarantined_files (
+                file_path TEXT PRIMARY KEY,
+                year INTEGER,
+                signature TEXT NOT NULL,
+                errors TEXT NOT NULL,
+                quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         conn.commit()
         conn.close()
         print("✅ Banco de dados criado com sucesso!")
     
+    def ensure_column(self, cursor: sqlite3.Cursor, table: str, column: str, definition: str):
+        """Adiciona uma coluna à tabela caso ela ainda não exista (bancos criados por versões antigas)."""
+        cursor.execute(f'PRAGMA table_info({table})')
+        if column not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    def ensure_nullable(self, cursor: sqlite3.Cursor, table: str, column: str):
+        """Remove a restrição NOT NULL de uma coluna (bancos criados por versões antigas), recriando a tabela."""
+        cursor.execute(f'PRAGMA table_info({table})')
+        columns = cursor.fetchall()
+        if not any(row[1] == column and row[3] for row in columns):
+            return
+        
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        create_sql = re.sub(rf'([(,]\s*{column}\s+\w+)\s+NOT NULL', r'\1', cursor.fetchone()[0], count=1)
+        create_sql = create_sql.replace(table, f'{table}_migration', 1)
+        
+        cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))
+        indexes = [row[0] for row in cursor.fetchall()]
+        
+        names = ', '.join(row[1] for row in columns)
+        
+        # Uma única transação: interrompida, a migração não deixa a tabela pela metade
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            # Tabela deixada por uma migração interrompida em versões anteriores
+            cursor.execute(f'DROP TABLE IF EXISTS {table}_migration')
+            cursor.execute(create_sql)
+            cursor.execute(f'INSERT INTO {table}_migration ({names}) SELECT {names} FROM {table}')
+            cursor.execute(f'DROP TABLE {table}')
+            cursor.execute(f'ALTER TABLE {table}_migration RENAME TO {table}')
+            for index_sql in indexes:
+                cursor.execute(index_sql)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+    
     def insert_disciplines_and_languages(self):
         """Insere disciplinas e idiomas únicos no banco de dados."""
         conn = sqlite3.connect(self.db_path)
@@ -189,111 +413,46 @@ class EnemQuestionExtractor:
         conn.commit()
         conn.close()
     
-    def insert_question(self, question_data: Dict) -> int:
+    def get_local_image_path(self, url: str, year: int, question_index: int,
+                             image_type: str = "question", alt_letter: str = None) -> Tuple[Path, str]:
         """
-        Insere uma questão no banco de dados.
+        Calcula onde uma imagem remota é (ou será) salva localmente.
         
-        Args:
-            question_data: Dados da questão
-            
         Returns:
-            ID da questão inserida
+            Tupla (caminho no disco, caminho relativo usado no banco)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Extrair extensão da URL
+        parsed_url = urlparse(url)
+        filename = os.path.basename(parsed_url.path)
         
-        discipline_id = self.get_discipline_id(question_data.get('discipline'))
-        language_id = self.get_language_id(question_data.get('language'))
-        
-        # Processar imagens no contexto
-        context = question_data.get('context', '')
-        if context:
-            context = self.process_context_images(context, question_data['year'], question_data['index'])
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO questions 
-            (title, index_number, year, discipline_id, language_id, context, 
-             alternatives_introduction, correct_alternative) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            question_data['title'],
-            question_data['index'],
-            question_data['year'],
-            discipline_id,
-            language_id,
-            context,
-            question_data.get('alternativesIntroduction', ''),
-            question_data.get('correctAlternative', '')
-        ))
-        
-        question_id = cursor.lastrowid
-        
-        # Se a questão já existe, buscar o ID
-        if question_id == 0:
-            cursor.execute('''
-                SELECT id FROM questions 
-                WHERE year = ? AND index_number = ? AND discipline_id = ? AND language_id = ?
-            ''', (question_data['year'], question_data['index'], discipline_id, language_id))
-            result = cursor.fetchone()
-            question_id = result[0] if result else None
+        # Criar nome do arquivo com estrutura organizada
+        if image_type == "alternative" and alt_letter:
+            image_filename = f"{year}_q{question_index}_alt_{alt_letter}_{filename}"
+        else:
+            image_filename = f"{year}_q{question_index}_{filename}"
         
-        conn.commit()
-        conn.close()
+        image_path = self.images_path / str(year) / image_filename
         
-        return question_id
+        # Criar caminho relativo simples
+        return image_path, f"images/{year}/{image_filename}"
     
-    def insert_alternatives(self, question_id: int, alternatives: List[Dict], year: int, question_index: int):
-        """Insere as alternativas de uma questão."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        for alt in alternatives:
-            # Baixar imagem da alternativa se existir
-            file_path = alt.get('file')
-            if file_path and file_path.startswith('https://'):
-                file_path = self.download_image(file_path, year, question_index, "alternative", alt['letter'])
-            
-            cursor.execute('''
-                INSERT OR IGNORE INTO alternatives 
-                (question_id, letter, text, file_path, is_correct) 
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                question_id,
-                alt['letter'],
-                alt['text'],
-                file_path,
-                alt.get('isCorrect', False)
-            ))
+    def resolve_local_images(self, text: Optional[str], year: int, question_index: int) -> Optional[str]:
+        """
+        Substitui URLs de imagens no markdown por caminhos locais já baixados, sem acessar a rede.
         
-        conn.commit()
-        conn.close()
-    
-    def insert_question_files(self, question_id: int, files: List[str], year: int, question_index: int):
-        """Insere os arquivos de uma questão."""
-        if not files:
-            return
-            
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        URLs cuja imagem ainda não foi baixada são mantidas.
+        """
+        if not text:
+            return text
         
-        for file_url in files:
-            # Baixar a imagem se for uma URL
-            if file_url.startswith('https://'):
-                local_path = self.download_image(file_url, year, question_index, "question")
-                cursor.execute('''
-                    INSERT OR IGNORE INTO question_files 
-                    (question_id, file_path) 
-                    VALUES (?, ?)
-                ''', (question_id, local_path))
-            else:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO question_files 
-                    (question_id, file_path) 
-                    VALUES (?, ?)
-                ''', (question_id, file_url))
+        def replace_image_url(match):
+            url = match.group(1)
+            image_path, relative_path = self.get_local_image_path(url, year, question_index)
+            if image_path.exists():
+                return match.group(0).replace(url, relative_path)
+            return match.group(0)
         
-        conn.commit()
-        conn.close()
+        return re.sub(r'!\[.*?\]\((https://[^)]+)\)', replace_image_url, text)
     
     def download_image(self, url: str, year: int, question_index: int, image_type: str = "question", alt_letter: str = None) -> str:
         """
@@ -310,24 +469,10 @@ class EnemQuestionExtractor:
             Caminho relativo da imagem salva
         """
         try:
-            # Extrair extensão da URL
-            parsed_url = urlparse(url)
-            filename = os.path.basename(parsed_url.path)
-            
-            # Criar nome do arquivo com estrutura organizada
-            if image_type == "alternative" and alt_letter:
-                image_filename = f"{year}_q{question_index}_alt_{alt_letter}_{filename}"
-            else:
-                image_filename = f"{year}_q{question_index}_{filename}"
+            image_path, relative_path = self.get_local_image_path(url, year, question_index, image_type, alt_letter)
             
             # Criar pasta do ano se não existir
-            year_images_path = self.images_path / str(year)
-            year_images_path.mkdir(exist_ok=True)
-            
-            image_path = year_images_path / image_filename
-            
-            # Criar caminho relativo simples
-            relative_path = f"images/{year}/{image_filename}"
+            image_path.parent.mkdir(exist_ok=True)
             
             # Verificar se a imagem já foi baixada
             if image_path.exists():
@@ -397,33 +542,23 @@ class EnemQuestionExtractor:
             print(f"⚠️  Pasta de questões não encontrada para {year}")
             return
         
-        questions_processed = 0
+        # Arquivos em quarentena sem alterações são ignorados sem serem lidos
+        quarantine = self.load_quarantine()
+        self.load_compressor()
+        
+        counts = {'applied': 0, 'quarantined': 0, 'skipped': 0}
         for question_folder in questions_path.iterdir():
             if question_folder.is_dir():
                 question_details_file = question_folder / "details.json"
                 if question_details_file.exists():
-                    try:
-                        with open(question_details_file, 'r', encoding='utf-8') as f:
-                            question_data = json.load(f)
-                        
-                        # Inserir questão
-                        question_id = self.insert_question(question_data)
-                        
-                        if question_id:
-                            # Inserir alternativas
-                            if 'alternatives' in question_data:
-                                self.insert_alternatives(question_id, question_data['alternatives'], year, question_data['index'])
-                            
-                            # Inserir arquivos
-                            if 'files' in question_data:
-                                self.insert_question_files(question_id, question_data['files'], year, question_data['index'])
-                            
-                            questions_processed += 1
-                    
-                    except Exception as e:
-                        print(f"❌ Erro ao processar questão {question_folder.name} de {year}: {e}")
-        
-        print(f"✅ Processadas {questions_processed} questões de {year}")
+                    status, _ = self.process_question_file(question_details_file, quarantine)
+                    counts[status] += 1
+        
+        summary = f"✅ Processadas {counts['applied']} questões de {year}"
+        if counts['quarantined'] or counts['skipped']:
+            summary += (f" ({counts['quarantined']} em quarentena, "
+                        f"{counts['skipped']} já em quarentena e sem alterações)")
+        print(summary)
     
     def extract_all_questions(self):
         """Extrai todas as questões de todos os anos."""
@@ -444,6 +579,769 @@ class EnemQuestionExtractor:
         
         print("✅ Extração concluída!")
     
+    def apply_exam_file(self, year: int):
+        """Insere ou atualiza o exame de um ano a partir do seu details.json."""
+        with open(self.quiz_items_path / str(year) / "details.json", 'r', encoding='utf-8') as f:
+            exam_details = json.load(f)
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO exams (title, year)
+            VALUES (?, ?)
+            ON CONFLICT(year) DO UPDATE SET title = excluded.title
+        ''', (exam_details['title'], year))
+        self.bump_version(cursor)
+        
+        conn.commit()
+        conn.close()
+    
+    def process_question_file(self, details_file: Path,
+                              quarantine: Optional[Dict[str, str]] = None) -> Tuple[str, Optional[int]]:
+        """
+        Valida uma questão e a grava no banco, ou a coloca em quarentena se for inválida.
+        
+        Arquivos em quarentena só são lidos novamente quando mudam (data de modificação ou tamanho)
+        ou quando as regras de validação mudam. Uma questão inválida não altera a versão já gravada.
+        
+        Args:
+            details_file: Caminho do details.json da questão
+            quarantine: Assinaturas dos arquivos em quarentena (padrão: consultadas no banco)
+            
+        Returns:
+            Tupla (situação, ID da questão), com situação 'applied', 'quarantined' ou 'skipped'
+            (arquivo em quarentena e sem alterações)
+        """
+        path = str(details_file)
+        signature = self.file_signature(details_file)
+        
+        if quarantine is None:
+            quarantine = self.load_quarantine(path)
+        if quarantine.get(path) == signature:
+            return 'skipped', None
+        
+        year_folder = details_file.parent.parent.parent.name
+        year = int(year_folder) if year_folder.isdigit() else None
+        
+        try:
+            with open(details_file, 'r', encoding='utf-8') as f:
+                question_data = json.load(f)
+        except ValueError as e:
+            errors = [f"JSON inválido: {e}"]
+        else:
+            errors = validate_question(question_data, year, details_file.parent.name)
+        
+        question_id = None
+        if not errors:
+            try:
+                question_id = self.write_question(question_data)
+            except sqlite3.IntegrityError as e:
+                errors = [f"Erro ao gravar: {e}"]
+        
+        if errors:
+            self.quarantine_file(path, year, signature, errors)
+            # Uma versão válida anterior é mantida, mas não uma gravada pela metade (sem alternativas)
+            folder = details_file.parent.name
+            if year is not None and folder.partition('-')[0].isdigit():
+                if self.remove_question(year, folder, incomplete_only=True):
+                    print(f"🗑️  Removida do banco a versão incompleta de {path}")
+            return 'quarantined', None
+        
+        if path in quarantine:
+            self.release_file(path)
+        return 'applied', question_id
+    
+    def load_compressor(self):
+        """Carrega o dicionário de compressão do banco, uma vez por extração (ou lote de edições)."""
+        conn = sqlite3.connect(self.db_path)
+        self.compressor = TextCompressor.load(conn)
+        conn.close()
+    
+    def file_signature(self, details_file: Path) -> str:
+        """Identifica o conteúdo de um arquivo (e a versão das regras) sem lê-lo."""
+        stat = details_file.stat()
+        return f"{VALIDATION_VERSION}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def load_quarantine(self, path: Optional[str] = None) -> Dict[str, str]:
+        """Retorna as assinaturas dos arquivos em quarentena (ou de um único arquivo)."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        query = 'SELECT file_path, signature FROM quarantined_files WHERE 1=1'
+        params = []
+        
+        if path:
+            query += ' AND file_path = ?'
+            params.append(path)
+        
+        cursor.execute(query, params)
+        quarantine = dict(cursor.fetchall())
+        
+        conn.close()
+        return quarantine
+    
+    def quarantine_file(self, path: str, year: Optional[int], signature: str, errors: List[str]):
+        """Registra um arquivo inválido na quarentena, com todos os erros encontrados."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT OR REPLACE INTO quarantined_files (file_path, year, signature, errors)
+            VALUES (?, ?, ?, ?)
+        ''', (path, year, signature, json.dumps(errors, ensure_ascii=False)))
+        
+        conn.commit()
+        conn.close()
+        
+        more = f" (+{len(errors) - 1} erros)" if len(errors) > 1 else ""
+        print(f"⚠️  Questão em quarentena: {path}: {errors[0]}{more}")
+    
+    def release_file(self, path: str):
+        """Remove da quarentena um arquivo que voltou a ser válido."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('DELETE FROM quarantined_files WHERE file_path = ?', (path,))
+        conn.commit()
+        conn.close()
+    
+    def print_quarantine_report(self):
+        """Exibe os arquivos em quarentena e os motivos."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT file_path, errors, quarantined_at
+            FROM quarantined_files
+            ORDER BY year, file_path
+        ''')
+        rows = cursor.fetchall()
+        conn.close()
+        
+        print(f"\n🚧 ARQUIVOS EM QUARENTENA: {len(rows)}")
+        print("=" * 50)
+        for path, errors, quarantined_at in rows:
+            print(f"{path} ({quarantined_at})")
+            for error in json.loads(errors):
+                print(f"  - {error}")
+    
+    def write_question(self, question_data: Dict) -> int:
+        """
+        Insere ou atualiza uma questão já validada.
+        
+        As imagens são baixadas antes de abrir a transação; a questão, suas alternativas, seus
+        arquivos e o HTML renderizado (se render_inline) são gravados juntos em uma única
+        transação curta.
+        
+        Args:
+            question_data: Conteúdo do details.json da questão
+            
+        Returns:
+            ID da questão gravada
+        """
+        year = question_data['year']
+        index_number = question_data['index']
+        discipline_id = self.get_discipline_id(question_data.get('discipline'))
+        language_id = self.get_language_id(question_data.get('language'))
+        introduction = question_data.get('alternativesIntroduction', '')
+        
+        context = question_data.get('context', '')
+        if context:
+            context = self.process_context_images(context, year, index_number)
+        
+        alternatives = []
+        for alt in question_data.get('alternatives', []):
+            file_path = alt.get('file')
+            if file_path and file_path.startswith('https://'):
+                file_path = self.download_image(file_path, year, index_number, "alternative", alt['letter'])
+            alternatives.append((alt['letter'], alt['text'], file_path, alt.get('isCorrect', False)))
+        
+        files = [
+            self.download_image(file_url, year, index_number, "question") if file_url.startswith('https://') else file_url
+            for file_url in question_data.get('files') or []
+        ]
+        
+        encode = self.compressor.compress if self.compressor else (lambda text: text)
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # A questão é identificada pelo ano, índice e idioma (a disciplina pode ter sido corrigida)
+            cursor.execute('''
+                SELECT id FROM questions
+                WHERE year = ? AND index_number = ? AND language_id IS ?
+                ORDER BY id
+            ''', (year, index_number, language_id))
+            question_ids = [row[0] for row in cursor.fetchall()]
+            
+            # Linhas duplicadas da mesma questão (gravadas por versões antigas) são removidas
+            if len(question_ids) > 1:
+                self.delete_questions(cursor, question_ids[1:])
+            
+            values = (
+                question_data['title'],
+                discipline_id,
+                encode(context),
+                encode(introduction),
+                question_data.get('correctAlternative', '')
+            )
+            
+            if question_ids:
+                question_id = question_ids[0]
+                cursor.execute('''
+                    UPDATE questions
+                    SET title = ?, discipline_id = ?, context = ?, alternatives_introduction = ?,
+                        correct_alternative = ?
+                    WHERE id = ?
+                ''', values + (question_id,))
+                cursor.execute('DELETE FROM alternatives WHERE question_id = ?', (question_id,))
+                cursor.execute('DELETE FROM question_files WHERE question_id = ?', (question_id,))
+            else:
+                # Em um snapshot, a questão mantém o ID publicado (None: próximo ID livre)
+                language = question_data.get('language') if language_id else None
+                cursor.execute('''
+                    INSERT INTO questions
+                    (id, title, discipline_id, context, alternatives_introduction, correct_alternative,
+                     index_number, year, language_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (self.preserved_ids.get((year, index_number, language)),) + values +
+                      (index_number, year, language_id))
+                question_id = cursor.lastrowid
+            
+            alternative_texts = []
+            for letter, text, file_path, is_correct in sorted(alternatives, key=lambda alt: alt[0]):
+                cursor.execute('''
+                    INSERT INTO alternatives
+                    (question_id, letter, text, file_path, is_correct)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (question_id, letter, encode(text), file_path, is_correct))
+                alternative_texts.append((cursor.lastrowid, text))
+            
+            cursor.executemany('''
+                INSERT INTO question_files (question_id, file_path)
+                VALUES (?, ?)
+            ''', [(question_id, file_path) for file_path in files])
+            
+            if self.render_inline:
+                job = self.build_render_job(question_id, year, index_number, context, introduction,
+                                            alternative_texts)
+                _, context_html, introduction_html, alternatives_html, digest = _render_question_html(job)
+                cursor.execute('''
+                    UPDATE questions
+                    SET context_html = ?, alternatives_introduction_html = ?, html_hash = ?
+                    WHERE id = ?
+                ''', (encode(context_html), encode(introduction_html), digest, question_id))
+                cursor.executemany('''
+                    UPDATE alternatives SET text_html = ? WHERE id = ?
+                ''', [(encode(text_html), alt_id) for alt_id, text_html in alternatives_html])
+            
+            self.bump_version(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        return question_id
+    
+    def remove_question(self, year: int, folder_name: str, incomplete_only: bool = False) -> bool:
+        """
+        Remove do banco a questão cuja pasta (ex.: '12' ou '1-ingles') foi apagada.
+        
+        Args:
+            year: Ano da questão
+            folder_name: Nome da pasta da questão
+            incomplete_only: Se True, remove apenas linhas sem alternativas (gravadas pela metade)
+            
+        Returns:
+            True se alguma linha foi removida
+        """
+        index_number, _, language = folder_name.partition('-')
+        language_id = self.get_language_id(language) if language else None
+        
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        query = '''
+            SELECT id FROM questions q
+            WHERE year = ? AND index_number = ? AND language_id IS ?
+        '''
+        
+        if incomplete_only:
+            query += ' AND NOT EXISTS (SELECT 1 FROM alternatives a WHERE a.question_id = q.id)'
+        
+        cursor.execute(query, (year, int(index_number), language_id))
+        question_ids = [row[0] for row in cursor.fetchall()]
+        
+        if question_ids:
+            self.delete_questions(cursor, question_ids)
+            self.bump_version(cursor)
+        
+        conn.commit()
+        conn.close()
+        
+        return bool(question_ids)
+    
+    def delete_questions(self, cursor: sqlite3.Cursor, question_ids: List[int]):
+        """Apaga questões com suas alternativas, arquivos e entradas no índice de semelhantes."""
+        params = [(question_id,) for question_id in question_ids]
+        cursor.executemany('DELETE FROM similar_questions WHERE question_id = ?', params)
+        cursor.executemany('DELETE FROM similar_questions WHERE similar_question_id = ?', params)
+        cursor.executemany('DELETE FROM alternatives WHERE question_id = ?', params)
+        cursor.executemany('DELETE FROM question_files WHERE question_id = ?', params)
+        cursor.executemany('DELETE FROM questions WHERE id = ?', params)
+    
+    def bump_version(self, cursor: sqlite3.Cursor):
+        """Avança a versão do banco (PRAGMA user_version) para que os leitores descartem seus caches."""
+        cursor.execute('PRAGMA user_version')
+        version = max(int(time.time()), cursor.fetchone()[0] + 1)
+        cursor.execute(f'PRAGMA user_version = {version}')
+    
+    def build_render_job(self, question_id: int, year: int, index_number: int, context: Optional[str],
+                         introduction: Optional[str], alternatives: List[Tuple[int, str]]) -> Tuple:
+        """
+        Prepara a renderização HTML de uma questão, com imagens já apontando para os arquivos locais.
+        
+        Returns:
+            Tupla (id, contexto, introdução, [(id da alternativa, texto), ...], hash do conteúdo)
+        """
+        context = self.resolve_local_images(context, year, index_number)
+        alternatives = [
+            (alt_id, self.resolve_local_images(text, year, index_number))
+            for alt_id, text in alternatives
+        ]
+        
+        digest = hashlib.sha1(json.dumps(
+            [HTML_RENDER_VERSION, context, introduction, alternatives], ensure_ascii=False
+        ).encode('utf-8')).hexdigest()
+        
+        return question_id, context, introduction, alternatives, digest
+    
+    def render_html_contents(self, max_workers: Optional[int] = None):
+        """
+        Pré-renderiza contexto, introdução e alternativas em HTML sanitizado.
+        
+        Apenas questões cujo conteúdo mudou desde a última renderização (ou que foram
+        renderizadas por outra versão do renderizador) são processadas, em paralelo.
+        
+        Args:
+            max_workers: Número de processos usados na renderização (padrão: número de CPUs)
+        """
+        print("🎨 Renderizando HTML das questões...")
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        compressor = TextCompressor.load(conn)
+        
+        cursor.execute('''
+            SELECT id, year, index_number, context, alternatives_introduction, html_hash
+            FROM questions
+        ''')
+        questions = cursor.fetchall()
+        
+        cursor.execute('SELECT id, question_id, text FROM alternatives ORDER BY question_id, letter')
+        alternatives_by_question = {}
+        for alt_id, question_id, text in cursor.fetchall():
+            alternatives_by_question.setdefault(question_id, []).append((alt_id, decode_text(compressor, text)))
+        
+        jobs = []
+        for question_id, year, index_number, context, introduction, html_hash in questions:
+            job = self.build_render_job(
+                question_id, year, index_number,
+                decode_text(compressor, context),
+                decode_text(compressor, introduction),
+                alternatives_by_question.get(question_id, [])
+            )
+            
+            if job[-1] != html_hash:
+                jobs.append(job)
+        
+        if not jobs:
+            conn.close()
+            print("✅ HTML já está atualizado")
+            return
+        
+        if max_workers == 1:
+            rendered = [_render_question_html(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                rendered = list(executor.map(_render_question_html, jobs, chunksize=64))
+        
+        # Em bancos comprimidos, o HTML também é gravado comprimido
+        encode = compressor.compress if compressor else (lambda text: text)
+        
+        for question_id, context_html, introduction_html, alternatives_html, digest in rendered:
+            cursor.execute('''
+                UPDATE questions
+                SET context_html = ?, alternatives_introduction_html = ?, html_hash = ?
+                WHERE id = ?
+            ''', (encode(context_html), encode(introduction_html), digest, question_id))
+            cursor.executemany('''
+                UPDATE alternatives SET text_html = ? WHERE id = ?
+            ''', [(encode(text_html), alt_id) for alt_id, text_html in alternatives_html])
+        
+        conn.commit()
+        conn.close()
+        
+        print(f"✅ Renderizadas {len(rendered)} questões em HTML")
+    
+    def build_snapshot(self):
+        """Executa todas as etapas de extração sobre o banco em self.db_path."""
+        # Extrair todas as questões (o HTML fica para a etapa de renderização em paralelo)
+        self.render_inline = False
+        try:
+            self.extract_all_questions()
+        finally:
+            self.render_inline = True
+        
+        # Corrigir caminhos de imagens se necessário
+        self.fix_image_paths()
+        
+        # Pré-renderizar o markdown em HTML
+        self.render_html_contents()
+        
+        # Calcular as questões semelhantes
+        self.build_similarity_index()
+    
+    def publish_snapshot(self, page_size: int = 4096) -> bool:
+        """
+        Constrói um novo banco em arquivo temporário e o publica atomicamente no lugar do atual.
+        
+        O banco publicado continua sendo lido normalmente durante toda a construção. O novo arquivo
+        parte de um esquema vazio (questões apagadas, duplicadas ou gravadas pela metade no banco
+        atual não são herdadas; as imagens já baixadas são reaproveitadas), mas cada questão mantém
+        o ID que tinha no banco publicado e as novas recebem IDs acima do maior já usado, para que
+        IDs guardados por clientes (simulados, gabaritos, listagens) continuem válidos. Ele passa
+        por todas as etapas de extração, é otimizado (ANALYZE e VACUUM INTO com o page_size pedido)
+        e verificado (integrity_check e foreign_key_check). Só então é copiado para o banco
+        publicado com a API de backup do SQLite, em uma única transação: como o banco publicado está
+        em modo WAL, os leitores não são bloqueados e passam do snapshot anterior para o novo na
+        próxima leitura (inclusive conexões mantidas abertas, como a da API). A versão publicada
+        (timestamp Unix da publicação) fica em PRAGMA user_version.
+        
+        A publicação inteira ocorre com a trava de escrita (write_lock): o modo de observação espera
+        e aplica sobre o novo snapshot as edições feitas durante a construção.
+        
+        Args:
+            page_size: Tamanho de página de um banco novo (um banco já publicado mantém o seu)
+            
+        Returns:
+            True se o snapshot foi publicado, False se a verificação falhou
+        """
+        live_path = self.db_path
+        build_path = f"{live_path}.building"
+        publish_path = f"{live_path}.publishing"
+        
+        with self.write_lock():
+            for path in (build_path, publish_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            
+            # Em modo WAL, o backup só pode gravar no banco publicado com o mesmo tamanho de página
+            if os.path.exists(live_path):
+                conn = sqlite3.connect(live_path)
+                live_page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+                conn.close()
+                if live_page_size != page_size:
+                    print(f"⚠️  Mantendo o page_size {live_page_size} do banco publicado (pedido: {page_size})")
+                    page_size = live_page_size
+            
+            print(f"🏗️  Construindo novo snapshot em {build_path}...")
+            
+            self.preserved_ids, last_id = self.load_question_ids(live_path)
+            self.db_path = build_path
+            try:
+                self.create_database()
+                self.insert_disciplines_and_languages()
+                
+                # Questões novas recebem IDs após o maior já usado (mesmo que por uma questão apagada)
+                conn = sqlite3.connect(build_path)
+                conn.execute('''
+                    INSERT INTO sqlite_sequence (name, seq) VALUES ('questions', ?)
+                ''', (last_id,))
+                conn.commit()
+                conn.close()
+                
+                self.build_snapshot()
+            finally:
+                self.db_path = live_path
+                self.preserved_ids = {}
+            
+            # Otimizar: estatísticas do planejador e arquivo compactado com o page_size desejado
+            version = int(time.time())
+            conn = sqlite3.connect(build_path)
+            conn.execute('ANALYZE')
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+            conn.execute(f'PRAGMA page_size = {int(page_size)}')
+            conn.execute('VACUUM INTO ?', (publish_path,))
+            conn.close()
+            os.remove(build_path)
+            
+            # Verificar o arquivo que será publicado
+            conn = sqlite3.connect(publish_path)
+            integrity = conn.execute('PRAGMA integrity_check').fetchall()
+            foreign_keys = conn.execute('PRAGMA foreign_key_check').fetchall()
+            question_count = conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0]
+            
+            if integrity != [('ok',)] or foreign_keys or question_count == 0:
+                conn.close()
+                print(f"❌ Snapshot inválido, publicação cancelada: integridade={integrity[:3]}, "
+                      f"chaves estrangeiras={len(foreign_keys)} problemas, questões={question_count}")
+                os.remove(publish_path)
+                return False
+            
+            # Cópia em uma única transação; leituras em andamento terminam no snapshot anterior
+            target = sqlite3.connect(live_path, timeout=30)
+            if target.execute('PRAGMA page_size').fetchone()[0] != page_size:
+                # Banco publicado ainda vazio: o tamanho de página só pode mudar antes do modo WAL
+                target.execute(f'PRAGMA page_size = {int(page_size)}')
+            target.execute('PRAGMA journal_mode = WAL')
+            conn.backup(target)
+            target.close()
+            conn.close()
+            os.remove(publish_path)
+        
+        print(f"✅ Snapshot {version} publicado em {live_path} ({question_count} questões)")
+        return True
+    
+    def load_question_ids(self, db_path: str) -> Tuple[Dict[Tuple[int, int, Optional[str]], int], int]:
+        """
+        Lê os IDs das questões de um banco publicado.
+        
+        Args:
+            db_path: Caminho do banco publicado
+            
+        Returns:
+            Tupla (dicionário (ano, índice, idioma) -> ID, maior ID já usado)
+        """
+        if not os.path.exists(db_path):
+            return {}, 0
+        
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('questions', 'sqlite_sequence')")
+        tables = {row[0] for row in cursor.fetchall()}
+        if 'questions' not in tables:
+            conn.close()
+            return {}, 0
+        
+        # Entre linhas duplicadas de uma mesma questão, vale a de menor ID (como em write_question)
+        cursor.execute('''
+            SELECT q.year, q.index_number, l.value, MIN(q.id)
+            FROM questions q
+            LEFT JOIN languages l ON q.language_id = l.id
+            GROUP BY q.year, q.index_number, l.value
+        ''')
+        question_ids = {(year, index_number, language): question_id
+                        for year, index_number, language, question_id in cursor.fetchall()}
+        
+        cursor.execute('SELECT MAX(id) FROM questions')
+        last_id = cursor.fetchone()[0] or 0
+        if 'sqlite_sequence' in tables:
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'questions'")
+            row = cursor.fetchone()
+            last_id = max(last_id, row[0] if row else 0)
+        
+        conn.close()
+        return question_ids, last_id
+    
+    @contextmanager
+    def write_lock(self):
+        """
+        Trava exclusiva, entre processos, das escritas no banco publicado (publicação e modo de observação).
+        
+        Sem ela, uma edição aplicada durante a construção de um snapshot seria perdida quando o
+        snapshot, montado a partir dos arquivos lidos antes da edição, fosse publicado.
+        """
+        with open(f"{self.db_path}.lock", 'a+b') as lock_file:
+            if not self._try_lock(lock_file, blocking=False):
+                print("⏳ Aguardando outra escrita no banco (publicação de snapshot em andamento)...")
+                self._try_lock(lock_file, blocking=True)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def _try_lock(self, lock_file, blocking: bool) -> bool:
+        """Obtém a trava do arquivo (fcntl no Linux/macOS, msvcrt no Windows)."""
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+                return True
+            except BlockingIOError:
+                return False
+        
+        lock_file.seek(0)
+        while True:
+            try:
+                # LK_LOCK tenta por até 10 segundos antes de falhar
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+    
+    def extract_sharded(self, shards_path: str = "shards", years: Optional[List[int]] = None,
+                        max_workers: Optional[int] = None):
+        """
+        Extrai as questões em um banco SQLite por ano, construídos em paralelo por processos separados.
+        
+        Cada pasta quiz-items/<ano> gera <shards_path>/<ano>.db, e o catálogo
+        <shards_path>/catalog.db registra os shards disponíveis e guarda o índice de questões
+        semelhantes. Reconstruir um ano altera apenas o seu shard e a linha correspondente do
+        catálogo (além do índice de semelhantes, recalculado sobre todos os anos).
+        
+        Args:
+            shards_path: Pasta onde os shards e o catálogo são gravados
+            years: Anos a (re)construir (padrão: todos os anos da pasta quiz-items)
+            max_workers: Número de processos (padrão: número de CPUs)
+        """
+        print("🚀 Iniciando extração em shards anuais...")
+        
+        shards_dir = Path(shards_path)
+        shards_dir.mkdir(exist_ok=True)
+        
+        if years is None:
+            years = sorted(
+                int(year_folder.name) for year_folder in self.quiz_items_path.iterdir()
+                if year_folder.is_dir() and year_folder.name.isdigit()
+            )
+        
+        catalog = sqlite3.connect(shards_dir / "catalog.db")
+        catalog.execute('''
+            CREATE TABLE IF NOT EXISTS shards (
+                year INTEGER PRIMARY KEY,
+                file_path TEXT NOT NULL,
+                question_count INTEGER NOT NULL,
+                min_question_id INTEGER,
+                max_question_id INTEGER,
+                built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        catalog.commit()
+        
+        jobs = [(year, str(shards_dir / f"{year}.db"), str(self.quiz_items_path)) for year in years]
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for year, shard_path, count, min_id, max_id in executor.map(_build_year_shard, jobs):
+                catalog.execute('''
+                    INSERT OR REPLACE INTO shards
+                    (year, file_path, question_count, min_question_id, max_question_id)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (year, os.path.basename(shard_path), count, min_id, max_id))
+                catalog.commit()
+                print(f"✅ Shard de {year} publicado ({count} questões)")
+        
+        catalog.close()
+        
+        # O índice de semelhantes cruza os anos, então é recalculado sobre todos os shards
+        self.build_sharded_similarity_index(shards_path, max_workers=max_workers)
+        print("✅ Extração em shards concluída!")
+    
+    def build_similarity_index(self, k: int = 10, max_workers: Optional[int] = None):
+        """
+        Recalcula a tabela similar_questions com as k questões mais semelhantes a cada questão.
+        
+        A similaridade é o cosseno entre vetores TF-IDF de contexto, introdução e alternativas
+        (ver similarity_index.py).
+        
+        Args:
+            k: Número de questões semelhantes guardadas por questão
+            max_workers: Número de processos usados no cálculo (padrão: número de CPUs)
+        """
+        print("🔗 Calculando questões semelhantes...")
+        
+        conn = sqlite3.connect(self.db_path)
+        documents = self.load_similarity_documents(conn)
+        self.write_similarity_index(conn, documents, k, max_workers)
+        conn.close()
+        
+        print(f"✅ Índice de semelhança criado para {len(documents)} questões")
+    
+    def build_sharded_similarity_index(self, shards_path: str = "shards", k: int = 10,
+                                       max_workers: Optional[int] = None):
+        """
+        Calcula o índice de questões semelhantes sobre todos os shards e o grava no catalog.db.
+        
+        Questões semelhantes costumam estar em anos diferentes, então o índice não pode ser
+        calculado por shard: ele é recalculado sobre todos os anos sempre que algum shard muda.
+        
+        Args:
+            shards_path: Pasta com os shards e o catálogo
+            k: Número de questões semelhantes guardadas por questão
+            max_workers: Número de processos usados no cálculo (padrão: número de CPUs)
+        """
+        print("🔗 Calculando questões semelhantes entre os shards...")
+        
+        shards_dir = Path(shards_path)
+        catalog = sqlite3.connect(shards_dir / "catalog.db")
+        catalog.execute('''
+            CREATE TABLE IF NOT EXISTS similar_questions (
+                question_id INTEGER NOT NULL,
+                rank INTEGER NOT NULL,
+                similar_question_id INTEGER NOT NULL,
+                score REAL NOT NULL,
+                PRIMARY KEY (question_id, rank)
+            ) WITHOUT ROWID
+        ''')
+        
+        documents = {}
+        for (file_path,) in catalog.execute('SELECT file_path FROM shards ORDER BY year').fetchall():
+            conn = sqlite3.connect(shards_dir / file_path)
+            documents.update(self.load_similarity_documents(conn))
+            conn.close()
+        
+        self.write_similarity_index(catalog, documents, k, max_workers)
+        catalog.close()
+        
+        print(f"✅ Índice de semelhança criado para {len(documents)} questões em {shards_dir / 'catalog.db'}")
+    
+    def load_similarity_documents(self, conn: sqlite3.Connection) -> Dict[int, str]:
+        """Lê o texto completo (contexto, introdução e alternativas) de cada questão do banco."""
+        cursor = conn.cursor()
+        compressor = TextCompressor.load(conn)
+        
+        cursor.execute('SELECT id, context, alternatives_introduction FROM questions')
+        documents = {
+            question_id: [decode_text(compressor, context) or '', decode_text(compressor, introduction) or '']
+            for question_id, context, introduction in cursor.fetchall()
+        }
+        
+        cursor.execute('SELECT question_id, text FROM alternatives ORDER BY question_id, letter')
+        for question_id, text in cursor.fetchall():
+            if question_id in documents:
+                documents[question_id].append(decode_text(compressor, text) or '')
+        
+        return {question_id: '\n'.join(parts) for question_id, parts in documents.items()}
+    
+    def write_similarity_index(self, conn: sqlite3.Connection, documents: Dict[int, str], k: int,
+                               max_workers: Optional[int]):
+        """Calcula os vizinhos de cada questão e substitui a tabela similar_questions do banco."""
+        rows = [
+            (question_id, rank, similar_id, score)
+            for question_id, neighbours in find_similar(documents, k, max_workers)
+            for rank, (similar_id, score) in enumerate(neighbours, start=1)
+        ]
+        
+        # Substituição completa em uma única transação
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM similar_questions')
+        cursor.executemany('''
+            INSERT INTO similar_questions (question_id, rank, similar_question_id, score)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+        
+        conn.commit()
+    
     def get_statistics(self):
         """Exibe estatísticas do banco de dados."""
         conn = sqlite3.connect(self.db_path)
@@ -472,11 +1370,17 @@ class EnemQuestionExtractor:
         ''')
         by_discipline = cursor.fetchall()
         
+        # Arquivos inválidos mantidos fora do banco
+        cursor.execute('SELECT COUNT(*) FROM quarantined_files')
+        total_quarantined = cursor.fetchone()[0]
+        
         conn.close()
         
         print("\n📊 ESTATÍSTICAS DO BANCO DE DADOS")
         print("=" * 50)
         print(f"Total de questões: {total_questions}")
+        if total_quarantined:
+            print(f"Arquivos em quarentena: {total_quarantined} (python extract_questions.py --quarantine)")
         
         print("\n📅 Questões por ano:")
         for year, count in by_year:
@@ -568,6 +1472,47 @@ class EnemQuestionExtractor:
         
         print(f"✅ Corrigidos {len(questions_with_urls)} contextos, {len(files_with_urls)} arquivos e {len(alternatives_with_urls)} alternativas")
 
+def _build_year_shard(job: Tuple) -> Tuple[int, str, int, int, int]:
+    """
+    Constrói o shard de um ano em um arquivo temporário e o move para o lugar (executado em processos filhos).
+    
+    Returns:
+        Tupla (ano, caminho do shard, total de questões, menor ID, maior ID)
+    """
+    year, shard_path, quiz_items_path = job
+    tmp_path = f"{shard_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    extractor = EnemQuestionExtractor(tmp_path)
+    extractor.quiz_items_path = Path(quiz_items_path)
+    extractor.render_inline = False
+    extractor.create_database()
+    extractor.insert_disciplines_and_languages()
+    
+    conn = sqlite3.connect(tmp_path)
+    conn.execute('''
+        INSERT INTO sqlite_sequence (name, seq) VALUES ('questions', ?)
+    ''', (year * SHARD_ID_BLOCK,))
+    conn.commit()
+    conn.close()
+    
+    extractor.extract_questions_from_year(year)
+    extractor.fix_image_paths()
+    extractor.render_html_contents(max_workers=1)
+    
+    conn = sqlite3.connect(tmp_path)
+    count, min_id, max_id = conn.execute('SELECT COUNT(*), MIN(id), MAX(id) FROM questions').fetchone()
+    # O shard é substituído com os.replace, que não é seguro para arquivos em modo WAL
+    # (os arquivos -wal e -shm do shard anterior continuariam em uso)
+    conn.execute('PRAGMA journal_mode = DELETE')
+    conn.close()
+    
+    # Leitores com o shard antigo aberto continuam lendo o arquivo anterior até fecharem a conexão
+    os.replace(tmp_path, shard_path)
+    return year, shard_path, count, min_id, max_id
+
+
 def main():
     """Função principal do script."""
     import sys
@@ -585,11 +1530,39 @@ def main():
         extractor.fix_image_paths()
         return
     
-    # Extrair todas as questões
-    extractor.extract_all_questions()
+    if len(sys.argv) > 1 and sys.argv[1] == "--sharded":
+        # Ex.: python extract_questions.py --sharded 2022 2023
+        years = [int(arg) for arg in sys.argv[2:] if arg.isdigit()] or None
+        extractor.extract_sharded(years=years)
+        return
     
-    # Corrigir caminhos de imagens se necessário
-    extractor.fix_image_paths()
+    if len(sys.argv) > 1 and sys.argv[1] == "--similar":
+        print("🔗 Modo de índice de semelhança ativado")
+        extractor.create_database()
+        extractor.build_similarity_index()
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--render-html":
+        print("🎨 Modo de renderização de HTML ativado")
+        extractor.create_database()
+        extractor.render_html_contents()
+        return
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--quarantine":
+        extractor.create_database()
+        extractor.print_quarantine_report()
+        return
+    
+    # Construir o novo banco em arquivo temporário e publicá-lo atomicamente
+    if not extractor.publish_snapshot():
+        return
+    
+    # O banco publicado é lido pela API sem descompressão: comprime-se apenas uma cópia
+    # Ex.: python extract_questions.py --compress enem_questions.compressed.db
+    if "--compress" in sys.argv[1:]:
+        position = sys.argv.index("--compress") + 1
+        output_path = sys.argv[position] if position < len(sys.argv) else COMPRESSED_DATABASE_PATH
+        compress_copy(extractor.db_path, output_path)
     
     # Exibir estatísticas
     extractor.get_statistics()
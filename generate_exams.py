@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Script para gerar simulados completos do ENEM a partir do banco de questões.
+"""
+
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from view_questions import EnemQuestionViewer
+
+
+# Áreas na ordem da prova (1º dia: linguagens e humanas; 2º dia: natureza e matemática)
+EXAM_AREAS = [
+    ('linguagens', 45),
+    ('ciencias-humanas', 45),
+    ('ciencias-natureza', 45),
+    ('matematica', 45),
+]
+
+# Questões de língua estrangeira que abrem a prova de linguagens
+FOREIGN_LANGUAGE_QUESTIONS = 5
+
+LANGUAGES = ['espanhol', 'ingles']
+
+
+class EnemExamGenerator:
+    def __init__(self, viewer: Optional[EnemQuestionViewer] = None, seed: Optional[int] = None):
+        """
+        Inicializa o gerador de simulados.
+        
+        Args:
+            viewer: Visualizador usado para acessar o banco (padrão: enem_questions.db)
+            seed: Semente do sorteio, para gerar simulados reproduzíveis
+        """
+        self.viewer = viewer or EnemQuestionViewer()
+        self.random = random.Random(seed)
+        # Questões disponíveis por (snapshot, ano inicial, ano final), carregadas uma única vez
+        self._pools = {}
+    
+    def load_pool(self, year_from: Optional[int] = None,
+                  year_to: Optional[int] = None) -> Dict[Tuple[str, Optional[str]], List[Tuple[int, int, int]]]:
+        """
+        Carrega, com uma consulta por banco, as questões disponíveis para sorteio.
+        
+        Questões sem alternativas não entram no sorteio, e cada (ano, índice) aparece uma única vez
+        por área: duplicatas são descartadas e uma questão com versão em língua estrangeira não é
+        sorteada também como questão comum.
+        
+        Args:
+            year_from: Ano inicial (inclusivo)
+            year_to: Ano final (inclusivo)
+        
+        Returns:
+            Dicionário (disciplina, idioma) -> lista de (id, ano, índice)
+        """
+        # Um novo snapshot publicado invalida as questões carregadas
+        key = (self.viewer.check_snapshot(), year_from, year_to)
+        if key in self._pools:
+            return self._pools[key]
+        
+        query = '''
+            SELECT q.id, q.year, q.index_number, d.value, l.value
+            FROM questions q
+            JOIN disciplines d ON q.discipline_id = d.id
+            LEFT JOIN languages l ON q.language_id = l.id
+            WHERE EXISTS (SELECT 1 FROM alternatives a WHERE a.question_id = q.id)
+        '''
+        
+        params = []
+        
+        if year_from:
+            query += ' AND q.year >= ?'
+            params.append(year_from)
+        
+        if year_to:
+            query += ' AND q.year <= ?'
+            params.append(year_to)
+        
+        # Versões em língua estrangeira primeiro; entre duplicatas, fica a de menor ID
+        query += ' ORDER BY l.value IS NULL, q.id'
+        
+        # Um ano único permite consultar apenas o shard correspondente
+        single_year = year_from if year_from and year_from == year_to else None
+        
+        pool = {}
+        seen = set()
+        for conn in self.viewer.iter_connections(year=single_year):
+            for question_id, year, index_number, discipline, language in conn.execute(query, params):
+                if (discipline, language, year, index_number) in seen:
+                    continue
+                seen.add((discipline, language, year, index_number))
+                seen.add((discipline, None, year, index_number))
+                pool.setdefault((discipline, language), []).append((question_id, year, index_number))
+        
+        self._pools = {cached: questions for cached, questions in self._pools.items() if cached[0] == key[0]}
+        self._pools[key] = pool
+        return pool
+    
+    def generate_exam(self, language: str = "ingles",
+                      year_from: Optional[int] = None,
+                      year_to: Optional[int] = None,
+                      exclude_ids: Optional[Iterable[int]] = None,
+                      hydrate: bool = False,
+                      format: str = "markdown") -> Dict:
+        """
+        Gera um simulado completo: 45 questões por área, sem repetição, na ordem da prova.
+        
+        Args:
+            language: Língua estrangeira escolhida ('espanhol' ou 'ingles')
+            year_from: Ano inicial das questões (inclusivo)
+            year_to: Ano final das questões (inclusivo)
+            exclude_ids: IDs de questões que não podem ser sorteadas
+            hydrate: Se True, inclui o conteúdo completo das questões (consultas em lote)
+            format: Formato do conteúdo quando hydrate=True ('markdown' ou 'html')
+        
+        Returns:
+            Simulado com o idioma escolhido e a lista numerada de questões
+        """
+        return self.generate_exams(1, language, year_from, year_to, exclude_ids, hydrate, format)[0]
+    
+    def generate_exams(self, count: int,
+                       language: str = "ingles",
+                       year_from: Optional[int] = None,
+                       year_to: Optional[int] = None,
+                       exclude_ids: Optional[Iterable[int]] = None,
+                       hydrate: bool = False,
+                       format: str = "markdown") -> List[Dict]:
+        """
+        Gera vários simulados de uma vez, reaproveitando as questões carregadas.
+        
+        Os parâmetros são os mesmos de generate_exam; language também aceita 'aleatorio'
+        para sortear o idioma de cada simulado.
+        """
+        if language not in LANGUAGES and language != "aleatorio":
+            raise ValueError(f"Idioma inválido: {language} (use {', '.join(LANGUAGES)} ou 'aleatorio')")
+        
+        pool = self.load_pool(year_from, year_to)
+        
+        if exclude_ids:
+            excluded = set(exclude_ids)
+            pool = {
+                key: [question for question in questions if question[0] not in excluded]
+                for key, questions in pool.items()
+            }
+        
+        exams = []
+        for _ in range(count):
+            exam_language = self.random.choice(LANGUAGES) if language == "aleatorio" else language
+            exams.append(self.sample_exam(pool, exam_language))
+        
+        if hydrate:
+            question_ids = list({item['id'] for exam in exams for item in exam['questions']})
+            questions = {question.id: question for question in self.viewer.get_questions_by_ids(question_ids, format)}
+            for exam in exams:
+                exam['questions'] = [dict(questions[item['id']].to_dict(), number=item['number']) for item in exam['questions']]
+        
+        return exams
+    
+    def sample_exam(self, pool: Dict[Tuple[str, Optional[str]], List[Tuple[int, int, int]]],
+                    language: str) -> Dict:
+        """Sorteia um simulado a partir das questões já carregadas."""
+        questions = []
+        
+        for discipline, total in EXAM_AREAS:
+            strata = [((discipline, None), total)]
+            if discipline == 'linguagens':
+                strata = [
+                    ((discipline, language), FOREIGN_LANGUAGE_QUESTIONS),
+                    ((discipline, None), total - FOREIGN_LANGUAGE_QUESTIONS),
+                ]
+            
+            for key, size in strata:
+                available = pool.get(key, [])
+                if len(available) < size:
+                    raise ValueError(
+                        f"Questões insuficientes para {key[0]}"
+                        f"{' (' + key[1] + ')' if key[1] else ''}: {len(available)} de {size}"
+                    )
+                
+                # Dentro de cada bloco, as questões seguem a ordem de índice da prova original
+                selected = sorted(self.random.sample(available, size), key=lambda question: (question[2], question[1]))
+                questions.extend(
+                    {'id': question_id, 'year': year, 'index': index_number, 'discipline': discipline}
+                    for question_id, year, index_number in selected
+                )
+        
+        for number, question in enumerate(questions, start=1):
+            question['number'] = number
+        
+        return {'language': language, 'questions': questions}
+
+
+def main():
+    """Função principal para demonstrar o gerador de simulados."""
+    generator = EnemExamGenerator()
+    
+    print("📝 GERADOR DE SIMULADOS DO ENEM")
+    print("=" * 50)
+    
+    exam = generator.generate_exam(language="espanhol", year_from=2015)
+    print(f"\n1. Simulado gerado com {len(exam['questions'])} questões ({exam['language']})")
+    for question in exam['questions'][:6]:
+        print(f"  {question['number']:3d}. {question['discipline']} - {question['year']} Q{question['index']}")
+    
+    start = time.perf_counter()
+    exams = generator.generate_exams(5000, language="aleatorio")
+    elapsed = time.perf_counter() - start
+    print(f"\n2. {len(exams)} simulados gerados em {elapsed:.2f}s ({len(exams) / elapsed:.0f} simulados/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Script para corrigir em lote folhas de respostas usando o gabarito do banco de questões do ENEM.
+
+O gabarito é carregado uma única vez em arrays NumPy, e as folhas são lidas de CSV ou JSONL em
+blocos de tamanho fixo, de modo que o uso de memória não depende do tamanho do arquivo.
+"""
+
+import csv
+import itertools
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from view_questions import EnemQuestionViewer
+
+
+LETTERS = 'ABCDE'
+
+# Código usado para respostas em branco ou inválidas
+BLANK = len(LETTERS)
+
+# Código do gabarito para questões sem alternativa correta cadastrada (nunca coincide com uma resposta)
+NO_KEY = 255
+
+
+class _CellCodes(dict):
+    """Tabela célula -> código da alternativa; qualquer outro valor conta como branco."""
+    
+    def __missing__(self, cell: str) -> int:
+        return BLANK
+
+
+# Conversão de células e caracteres (A-E ou a-e = 0-4; vazios, marcações duplas etc. = BLANK)
+CELL_CODES = _CellCodes({letter: code for code, letter in enumerate(LETTERS)})
+CELL_CODES.update({letter.lower(): code for code, letter in enumerate(LETTERS)})
+
+# Máximo de parâmetros por consulta IN (limite dos SQLite mais antigos)
+MAX_QUERY_PARAMS = 900
+
+
+class EnemAnswerGrader:
+    def __init__(self, question_ids: Sequence[int], viewer: Optional[EnemQuestionViewer] = None):
+        """
+        Carrega o gabarito das questões informadas.
+        
+        Args:
+            question_ids: IDs das questões, na ordem das colunas das folhas de respostas
+            viewer: Visualizador usado para acessar o banco (padrão: enem_questions.db)
+        """
+        self.viewer = viewer or EnemQuestionViewer()
+        self.question_ids = np.asarray(question_ids, dtype=np.int64)
+        self.column_index = {int(question_id): j for j, question_id in enumerate(self.question_ids)}
+        
+        key = self.load_answer_key()
+        missing = [question_id for question_id in self.column_index if question_id not in key]
+        if missing:
+            raise ValueError(f"Questões não encontradas no banco: {missing[:10]}")
+        
+        self.disciplines = sorted({discipline for _, discipline in key.values()})
+        discipline_index = {discipline: d for d, discipline in enumerate(self.disciplines)}
+        
+        # Gabarito (M) e matriz questão x disciplina (M x D) usada nos subtotais
+        self.correct = np.array([key[int(question_id)][0] for question_id in self.question_ids], dtype=np.uint8)
+        self.discipline_matrix = np.zeros((len(self.question_ids), len(self.disciplines)), dtype=np.int32)
+        for j, question_id in enumerate(self.question_ids):
+            self.discipline_matrix[j, discipline_index[key[int(question_id)][1]]] = 1
+        
+        # Contagem de respostas por questão e alternativa (M x 6), acumulada entre os lotes
+        self.letter_counts = np.zeros((len(self.question_ids), BLANK + 1), dtype=np.int64)
+        self.sheets_graded = 0
+    
+    def load_answer_key(self) -> Dict[int, Tuple[int, str]]:
+        """Busca a alternativa correta e a disciplina de cada questão, em consultas em lote."""
+        key = {}
+        ids = [int(question_id) for question_id in self.question_ids]
+        
+        for conn in self.viewer.iter_connections():
+            for start in range(0, len(ids), MAX_QUERY_PARAMS):
+                batch = ids[start:start + MAX_QUERY_PARAMS]
+                placeholders = ', '.join('?' for _ in batch)
+                cursor = conn.execute(f'''
+                    SELECT q.id, q.correct_alternative, d.value
+                    FROM questions q
+                    LEFT JOIN disciplines d ON q.discipline_id = d.id
+                    WHERE q.id IN ({placeholders})
+                ''', batch)
+                
+                for question_id, correct_alternative, discipline in cursor:
+                    letter = (correct_alternative or '').upper()
+                    code = LETTERS.index(letter) if len(letter) == 1 and letter in LETTERS else NO_KEY
+                    key[question_id] = (code, discipline or 'sem-disciplina')
+        
+        return key
+    
+    def encode_answers(self, answers: Sequence[str]) -> np.ndarray:
+        """
+        Converte folhas no formato texto (uma letra por questão, na ordem do gabarito) em matriz de códigos.
+        
+        Posições faltantes, espaços e caracteres inválidos são tratados como resposta em branco.
+        """
+        width = len(self.question_ids)
+        characters = itertools.chain.from_iterable(sheet.ljust(width)[:width] for sheet in answers)
+        codes = np.fromiter(map(CELL_CODES.__getitem__, characters), dtype=np.uint8, count=len(answers) * width)
+        return codes.reshape(len(answers), width)
+    
+    def grade(self, answers: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Corrige um lote de folhas de respostas.
+        
+        Args:
+            answers: Matriz N x M de códigos (0-4 para A-E, BLANK para branco)
+        
+        Returns:
+            Dicionário com 'totals' (N) e 'subtotals' (N x D, na ordem de self.disciplines)
+        """
+        hits = answers == self.correct
+        totals = hits.sum(axis=1)
+        subtotals = hits.astype(np.int32) @ self.discipline_matrix
+        
+        # Uma única contagem para todas as questões: cada questão ocupa BLANK + 1 posições
+        offsets = answers.astype(np.int64) + (BLANK + 1) * np.arange(answers.shape[1], dtype=np.int64)
+        self.letter_counts += np.bincount(
+            offsets.ravel(), minlength=answers.shape[1] * (BLANK + 1)
+        ).reshape(answers.shape[1], BLANK + 1)
+        self.sheets_graded += answers.shape[0]
+        
+        return {'totals': totals, 'subtotals': subtotals}
+    
+    def item_statistics(self) -> List[Dict]:
+        """
+        Estatísticas por questão acumuladas em todos os lotes corrigidos.
+        
+        Returns:
+            Lista com o índice de dificuldade (p-value: proporção de acertos) e a frequência
+            de cada alternativa e de respostas em branco
+        """
+        total = max(self.sheets_graded, 1)
+        frequencies = self.letter_counts / total
+        statistics = []
+        
+        for j, question_id in enumerate(self.question_ids):
+            correct = int(self.correct[j])
+            statistics.append({
+                'question_id': int(question_id),
+                'correct_alternative': LETTERS[correct] if correct != NO_KEY else None,
+                'p_value': float(frequencies[j, correct]) if correct != NO_KEY else None,
+                'frequencies': {letter: float(frequencies[j, code]) for code, letter in enumerate(LETTERS)},
+                'blank': float(frequencies[j, BLANK])
+            })
+        
+        return statistics
+    
+    def read_csv_chunks(self, path: str, chunk_size: int = 50000) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Lê folhas de um CSV em blocos.
+        
+        O cabeçalho deve ter o identificador do aluno na primeira coluna e os IDs das questões nas
+        demais, com uma letra por célula. Questões do gabarito ausentes no arquivo, células faltantes
+        em linhas curtas e valores inválidos contam como branco; linhas vazias são ignoradas.
+        """
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            width = len(header) - 1
+            
+            file_columns = []
+            key_columns = []
+            for position, column in enumerate(header[1:]):
+                if column.strip().isdecimal() and int(column) in self.column_index:
+                    file_columns.append(position)
+                    key_columns.append(self.column_index[int(column)])
+            
+            student_ids = []
+            rows = []
+            for row in reader:
+                if not row:
+                    continue
+                
+                cells = row[1:]
+                if len(cells) != width:
+                    cells = (cells + [''] * width)[:width]
+                
+                student_ids.append(row[0])
+                rows.append(cells)
+                if len(rows) == chunk_size:
+                    yield student_ids, self.encode_rows(rows, file_columns, key_columns)
+                    student_ids, rows = [], []
+            
+            if rows:
+                yield student_ids, self.encode_rows(rows, file_columns, key_columns)
+    
+    def encode_rows(self, rows: List[List[str]], file_columns: List[int], key_columns: List[int]) -> np.ndarray:
+        """
+        Converte células de CSV (uma letra por célula) na matriz de códigos na ordem do gabarito.
+        
+        Todas as linhas devem ter o mesmo número de células.
+        """
+        width = len(rows[0])
+        cells = itertools.chain.from_iterable(rows)
+        codes = np.fromiter(map(CELL_CODES.__getitem__, cells), dtype=np.uint8, count=len(rows) * width)
+        codes = codes.reshape(len(rows), width)
+        
+        answers = np.full((len(rows), len(self.question_ids)), BLANK, dtype=np.uint8)
+        answers[:, key_columns] = codes[:, file_columns]
+        return answers
+    
+    def read_jsonl_chunks(self, path: str, chunk_size: int = 50000) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Lê folhas de um JSONL em blocos.
+        
+        Cada linha deve ter o formato {"student_id": "...", "answers": {"<id da questão>": "A", ...}}.
+        Como no CSV, chaves que não são IDs do gabarito são ignoradas e questões ausentes, respostas
+        inválidas e folhas sem "answers" contam como branco; linhas vazias, JSON inválido e linhas
+        que não são objetos são ignorados.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            student_ids = []
+            answers = np.full((chunk_size, len(self.question_ids)), BLANK, dtype=np.uint8)
+            
+            for line in f:
+                if not line.strip():
+                    continue
+                
+                try:
+                    sheet = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(sheet, dict):
+                    continue
+                
+                row = len(student_ids)
+                student_ids.append(str(sheet.get('student_id', '')))
+                
+                sheet_answers = sheet.get('answers')
+                if not isinstance(sheet_answers, dict):
+                    sheet_answers = {}
+                
+                for question_id, letter in sheet_answers.items():
+                    j = self.column_index.get(int(question_id)) if question_id.strip().isdecimal() else None
+                    if j is not None and isinstance(letter, str):
+                        answers[row, j] = CELL_CODES[letter]
+                
+                if len(student_ids) == chunk_size:
+                    yield student_ids, answers
+                    student_ids = []
+                    answers = np.full((chunk_size, len(self.question_ids)), BLANK, dtype=np.uint8)
+            
+            if student_ids:
+                yield student_ids, answers[:len(student_ids)]
+    
+    def grade_file(self, input_path: str, output_path: str, chunk_size: int = 50000) -> int:
+        """
+        Corrige todas as folhas de um arquivo CSV ou JSONL e grava o resultado por aluno em CSV.
+        
+        Args:
+            input_path: Arquivo de entrada (.csv ou .jsonl)
+            output_path: CSV de saída com student_id, total e um subtotal por disciplina
+            chunk_size: Número de folhas processadas por bloco
+        
+        Returns:
+            Número de folhas corrigidas
+        """
+        if input_path.endswith('.jsonl'):
+            chunks = self.read_jsonl_chunks(input_path, chunk_size)
+        else:
+            chunks = self.read_csv_chunks(input_path, chunk_size)
+        
+        graded = 0
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['student_id', 'total'] + self.disciplines)
+            
+            for student_ids, answers in chunks:
+                result = self.grade(answers)
+                writer.writerows(
+                    [student_id, total] + subtotals
+                    for student_id, total, subtotals in zip(
+                        student_ids, result['totals'].tolist(), result['subtotals'].tolist()
+                    )
+                )
+                graded += len(student_ids)
+        
+        return graded
+
+
+def benchmark(sheets: int = 200000, db_path: str = "enem_questions.db"):
+    """Mede a vazão de correção com folhas sintéticas de uma prova de 180 questões."""
+    viewer = EnemQuestionViewer(db_path)
+    question_ids = [question.id for question in viewer.search_questions(limit=180)]
+    grader = EnemAnswerGrader(question_ids, viewer)
+    
+    rng = np.random.default_rng(0)
+    letters = np.array(list(LETTERS))
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, 'answers.csv')
+        output_path = os.path.join(tmp_dir, 'results.csv')
+        
+        with open(input_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['student_id'] + question_ids)
+            for start in range(0, sheets, 50000):
+                block = letters[rng.integers(0, len(LETTERS), size=(min(50000, sheets - start), len(question_ids)))]
+                writer.writerows([f"aluno{start + i}"] + row for i, row in enumerate(block.tolist()))
+        
+        start = time.perf_counter()
+        graded = grader.grade_file(input_path, output_path)
+        elapsed = time.perf_counter() - start
+    
+    print("\n📊 BENCHMARK DE CORREÇÃO")
+    print("=" * 50)
+    print(f"Folhas corrigidas: {graded} ({len(question_ids)} questões cada)")
+    print(f"Tempo total:       {elapsed:.2f}s (leitura do CSV, correção e gravação)")
+    print(f"Vazão:             {60 * graded / elapsed:,.0f} folhas por minuto")
+
+
+def main():
+    """Função principal do script."""
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--benchmark":
+        benchmark()
+        return
+    
+    if len(sys.argv) < 4:
+        print("Uso: python grade_answers.py <respostas.csv|respostas.jsonl> <resultado.csv> <ids das questões>")
+        print("     python grade_answers.py --benchmark")
+        print("Os IDs das questões são separados por vírgula, ex.: 1,2,3")
+        return
+    
+    question_ids = [int(question_id) for question_id in sys.argv[3].split(',')]
+    grader = EnemAnswerGrader(question_ids)
+    
+    graded = grader.grade_file(sys.argv[1], sys.argv[2])
+    print(f"✅ Corrigidas {graded} folhas de respostas em {sys.argv[2]}")
+    
+    print("\n📈 Questões mais difíceis:")
+    statistics = [item for item in grader.item_statistics() if item['p_value'] is not None]
+    for item in sorted(statistics, key=lambda item: item['p_value'])[:5]:
+        distractor = max((letter for letter in LETTERS if letter != item['correct_alternative']),
+                         key=lambda letter: item['frequencies'][letter])
+        print(f"  Questão {item['question_id']}: {100 * item['p_value']:.1f}% de acertos "
+              f"(distrator mais marcado: {distractor})")
+
+
+if __name__ == "__main__":
+    main()
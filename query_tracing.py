@@ -0,0 +1,276 @@
+"""
+Instrumentação opcional das consultas do EnemQuestionViewer.
+
+Usa os callbacks de trace e de progresso do sqlite3 para registrar, por método do visualizador,
+um histograma de latência, as linhas retornadas, os comandos SQL executados e o custo em
+instruções da máquina virtual do SQLite. Chamadas acima do limite de lentidão são registradas com o
+EXPLAIN QUERY PLAN de cada consulta. Os contadores podem ser exportados em JSON ou no formato texto
+do Prometheus.
+
+Sem um QueryTracer configurado, os métodos instrumentados custam apenas uma verificação de atributo.
+"""
+
+import functools
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+# Limites superiores (segundos) dos intervalos do histograma de latência
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Número de instruções da máquina virtual do SQLite entre chamadas do callback de progresso
+PROGRESS_STEPS = 1000
+
+# Número de chamadas lentas mantidas em memória
+SLOW_LOG_SIZE = 100
+
+# Número de consultas (com plano) exibidas por chamada lenta
+SLOW_LOG_PRINTED_STATEMENTS = 5
+
+
+def traced(method: Callable) -> Callable:
+    """Decorador para métodos do visualizador medidos pelo QueryTracer em self.tracer (se houver)."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        tracer = self.tracer
+        if tracer is None:
+            return method(self, *args, **kwargs)
+        return tracer.call(self, method, args, kwargs)
+    return wrapper
+
+
+class _Frame:
+    """Dados coletados durante uma chamada instrumentada."""
+    __slots__ = ('statements', 'progress')
+    
+    def __init__(self):
+        self.statements = []
+        self.progress = 0
+
+
+class QueryTracer:
+    def __init__(self, slow_query_ms: float = 100.0, buckets=LATENCY_BUCKETS, log_slow: bool = True):
+        """
+        Inicializa o coletor de métricas.
+        
+        Args:
+            slow_query_ms: Chamadas mais demoradas que isso (ms) entram no log de consultas lentas
+            buckets: Limites superiores (segundos) dos intervalos do histograma de latência
+            log_slow: Se True, imprime as chamadas lentas ao registrá-las
+        """
+        self.slow_query_ms = slow_query_ms
+        self.buckets = tuple(buckets)
+        self.log_slow = log_slow
+        self.slow_log = deque(maxlen=SLOW_LOG_SIZE)
+        
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods = {}
+    
+    def _stack(self) -> List[_Frame]:
+        """Pilha de chamadas instrumentadas em andamento na thread atual."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def instrument(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Registra os callbacks de trace e de progresso em uma conexão."""
+        conn.set_trace_callback(self._on_statement)
+        conn.set_progress_handler(self._on_progress, PROGRESS_STEPS)
+        return conn
+    
+    def _on_statement(self, statement: str):
+        stack = self._stack()
+        if stack:
+            stack[-1].statements.append(statement)
+    
+    def _on_progress(self) -> int:
+        stack = self._stack()
+        if stack:
+            stack[-1].progress += 1
+        return 0
+    
+    def call(self, viewer, method: Callable, args: tuple, kwargs: dict):
+        """Executa um método do visualizador registrando latência, linhas e consultas."""
+        stack = self._stack()
+        frame = _Frame()
+        stack.append(frame)
+        start = time.perf_counter()
+        
+        try:
+            result = method(viewer, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+        
+        if result is None:
+            rows = 0
+        elif isinstance(result, list):
+            rows = len(result)
+        else:
+            rows = 1
+        
+        slow = elapsed * 1000 >= self.slow_query_ms
+        self.record(method.__name__, elapsed, rows, frame, slow)
+        
+        if slow:
+            self.record_slow(viewer, method.__name__, elapsed, rows, frame)
+        
+        return result
+    
+    def record(self, name: str, elapsed: float, rows: int, frame: _Frame, slow: bool = False):
+        """Acumula as métricas de uma chamada."""
+        with self._lock:
+            metrics = self._methods.get(name)
+            if metrics is None:
+                metrics = self._methods[name] = {
+                    'count': 0,
+                    'sum': 0.0,
+                    'buckets': [0] * len(self.buckets),
+                    'rows': 0,
+                    'statements': 0,
+                    'vm_steps': 0,
+                    'slow': 0,
+                }
+            
+            metrics['count'] += 1
+            metrics['sum'] += elapsed
+            metrics['rows'] += rows
+            metrics['statements'] += len(frame.statements)
+            metrics['vm_steps'] += frame.progress * PROGRESS_STEPS
+            metrics['slow'] += slow
+            
+            for i, limit in enumerate(self.buckets):
+                if elapsed <= limit:
+                    metrics['buckets'][i] += 1
+                    break
+    
+    def record_slow(self, viewer, name: str, elapsed: float, rows: int, frame: _Frame):
+        """Registra uma chamada lenta com o plano de execução de cada consulta."""
+        plans = self.explain(viewer, frame.statements)
+        
+        entry = {
+            'method': name,
+            'duration_ms': round(elapsed * 1000, 2),
+            'rows': rows,
+            'vm_steps': frame.progress * PROGRESS_STEPS,
+            'timestamp': time.time(),
+            'statements': [{'sql': statement, 'plan': plans.get(statement)} for statement in frame.statements],
+        }
+        
+        with self._lock:
+            self.slow_log.append(entry)
+        
+        if self.log_slow:
+            print(f"⚠️  Consulta lenta: {name} levou {entry['duration_ms']:.1f} ms "
+                  f"({len(frame.statements)} comandos, {rows} linhas)")
+            # O log completo fica em slow_log; no terminal, apenas as primeiras consultas
+            explained = [statement for statement in entry['statements'] if statement['plan']]
+            for statement in explained[:SLOW_LOG_PRINTED_STATEMENTS]:
+                print(f"   {' '.join(statement['sql'].split())[:120]}")
+                for step in statement['plan']:
+                    print(f"     {step}")
+            if len(explained) > SLOW_LOG_PRINTED_STATEMENTS:
+                print(f"   ... mais {len(explained) - SLOW_LOG_PRINTED_STATEMENTS} consultas")
+    
+    def explain(self, viewer, statements: List[str]) -> Dict[str, List[str]]:
+        """Obtém o EXPLAIN QUERY PLAN das consultas SELECT executadas por uma chamada."""
+        selects = {statement for statement in statements if statement.lstrip().upper().startswith('SELECT')}
+        if not selects:
+            return {}
+        
+        plans = {}
+        # Os comandos do EXPLAIN vão para um quadro descartado, sem contar para nenhuma chamada
+        stack = self._stack()
+        stack.append(_Frame())
+        try:
+            for conn in viewer.iter_connections():
+                for statement in selects:
+                    try:
+                        plans[statement] = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {statement}')]
+                    except sqlite3.Error as e:
+                        plans[statement] = [f"erro: {e}"]
+                break
+        finally:
+            stack.pop()
+        
+        return plans
+    
+    def reset(self):
+        """Descarta as métricas e o log de consultas lentas."""
+        with self._lock:
+            self._methods = {}
+            self.slow_log.clear()
+    
+    def to_json(self) -> Dict:
+        """
+        Exporta as métricas em formato JSON.
+        
+        Returns:
+            Dicionário com as métricas por método (latência em ms) e o log de consultas lentas
+        """
+        with self._lock:
+            methods = {}
+            for name, metrics in sorted(self._methods.items()):
+                cumulative = 0
+                histogram = {}
+                for limit, count in zip(self.buckets, metrics['buckets']):
+                    cumulative += count
+                    histogram[f"{limit * 1000:g}"] = cumulative
+                histogram['+Inf'] = metrics['count']
+                
+                methods[name] = {
+                    'calls': metrics['count'],
+                    'total_ms': round(metrics['sum'] * 1000, 3),
+                    'mean_ms': round(metrics['sum'] * 1000 / metrics['count'], 3),
+                    'latency_ms_histogram': histogram,
+                    'rows': metrics['rows'],
+                    'statements': metrics['statements'],
+                    'vm_steps': metrics['vm_steps'],
+                    'slow_calls': metrics['slow'],
+                }
+            
+            return {'methods': methods, 'slow_queries': list(self.slow_log)}
+    
+    def to_prometheus(self, prefix: str = "enem_viewer") -> str:
+        """Exporta as métricas no formato texto do Prometheus."""
+        lines = [
+            f"# HELP {prefix}_call_duration_seconds Latência das chamadas do EnemQuestionViewer",
+            f"# TYPE {prefix}_call_duration_seconds histogram",
+        ]
+        
+        counters = [
+            ('rows', 'rows_returned_total', 'Linhas (questões) retornadas'),
+            ('statements', 'statements_total', 'Comandos SQL executados'),
+            ('vm_steps', 'vm_steps_total', 'Instruções da máquina virtual do SQLite (aproximado)'),
+            ('slow', 'slow_calls_total', 'Chamadas acima do limite de lentidão'),
+        ]
+        
+        with self._lock:
+            methods = sorted(self._methods.items())
+            
+            for name, metrics in methods:
+                cumulative = 0
+                for limit, count in zip(self.buckets, metrics['buckets']):
+                    cumulative += count
+                    lines.append(f'{prefix}_call_duration_seconds_bucket{{method="{name}",le="{limit:g}"}} {cumulative}')
+                lines.append(f'{prefix}_call_duration_seconds_bucket{{method="{name}",le="+Inf"}} {metrics["count"]}')
+                lines.append(f'{prefix}_call_duration_seconds_sum{{method="{name}"}} {metrics["sum"]:.6f}')
+                lines.append(f'{prefix}_call_duration_seconds_count{{method="{name}"}} {metrics["count"]}')
+            
+            for key, metric, description in counters:
+                lines.append(f"# HELP {prefix}_{metric} {description}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for name, metrics in methods:
+                    lines.append(f'{prefix}_{metric}{{method="{name}"}} {metrics[key]}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def save_json(self, filename: str):
+        """Salva as métricas em um arquivo JSON."""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
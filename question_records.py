@@ -0,0 +1,191 @@
+"""
+Registros leves (com __slots__) das questões do ENEM retornadas pelo EnemQuestionViewer.
+
+O conteúdo pesado das questões (contexto, introdução, alternativas e arquivos) só é carregado no
+primeiro acesso. Os registros também aceitam acesso por chave (question['title']) e podem ser
+convertidos para o dicionário usado anteriormente com to_dict().
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+
+class Label(NamedTuple):
+    """Rótulo e valor de uma disciplina ou idioma."""
+    label: str
+    value: str
+
+
+@lru_cache(maxsize=None)
+def make_label(label: str, value: str) -> Label:
+    """Retorna um rótulo compartilhado entre as questões (há poucas disciplinas e idiomas)."""
+    return Label(label, value)
+
+
+class Alternative:
+    __slots__ = ('letter', 'text', 'file', 'is_correct')
+    
+    def __init__(self, letter: str, text: Optional[str], file: Optional[str], is_correct: bool):
+        self.letter = letter
+        self.text = text
+        self.file = file
+        self.is_correct = is_correct
+    
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __repr__(self) -> str:
+        return f"Alternative(letter={self.letter!r}, is_correct={self.is_correct})"
+    
+    def to_dict(self) -> Dict:
+        """Converte a alternativa para dicionário."""
+        return {
+            'letter': self.letter,
+            'text': self.text,
+            'file': self.file,
+            'is_correct': self.is_correct
+        }
+
+
+# Campos do resumo da questão, presentes em qualquer consulta
+SUMMARY_FIELDS = ('id', 'title', 'index', 'year', 'discipline', 'language')
+
+# Campos carregados sob demanda (correct_alternative é lido junto com o resumo)
+CONTENT_FIELDS = ('context', 'alternatives_introduction', 'correct_alternative', 'alternatives', 'files')
+
+# Colunas lidas por Question.from_row (aliases q, d e l de questions, disciplines e languages)
+QUESTION_COLUMNS = '''
+    q.id, q.title, q.index_number, q.year, q.correct_alternative,
+    d.label as discipline_label, d.value as discipline_value,
+    l.label as language_label, l.value as language_value
+'''
+
+
+class Question:
+    __slots__ = ('id', 'title', 'index', 'year', 'correct_alternative', 'discipline', 'language', 'score',
+                 '_context', '_alternatives_introduction', '_alternatives', '_files', '_loader')
+    
+    def __init__(self, id: int, title: str, index: int, year: int, correct_alternative: Optional[str],
+                 discipline: Label, language: Optional[Label], score: Optional[float] = None):
+        self.id = id
+        self.title = title
+        self.index = index
+        self.year = year
+        self.correct_alternative = correct_alternative
+        self.discipline = discipline
+        self.language = language
+        self.score = score
+        # Conteúdo ainda não carregado (_alternatives é None até set_content)
+        self._context = None
+        self._alternatives_introduction = None
+        self._alternatives = None
+        self._files = None
+        self._loader = None
+    
+    @classmethod
+    def from_row(cls, cursor, row: tuple) -> 'Question':
+        """
+        Fábrica no estilo sqlite3.Row (pode ser usada como cursor.row_factory).
+        
+        Lê as colunas de QUESTION_COLUMNS seguidas, opcionalmente, da similaridade (score).
+        """
+        return cls(
+            row[0], row[1], row[2], row[3], row[4],
+            make_label(row[5], row[6]),
+            make_label(row[7], row[8]) if row[7] else None,
+            row[9] if len(row) > 9 else None
+        )
+    
+    def set_loader(self, loader: Callable[['Question'], None]):
+        """Define a função chamada no primeiro acesso ao conteúdo (deve chamar set_content)."""
+        self._loader = loader
+    
+    def set_content(self, context: Optional[str], alternatives_introduction: Optional[str],
+                    alternatives: List[Alternative], files: List[str]):
+        """Preenche o conteúdo da questão."""
+        self._context = context
+        self._alternatives_introduction = alternatives_introduction
+        self._alternatives = alternatives
+        self._files = files
+        self._loader = None
+    
+    @property
+    def loaded(self) -> bool:
+        """Indica se o conteúdo da questão já foi carregado."""
+        return self._alternatives is not None
+    
+    def load(self):
+        """Carrega o conteúdo da questão, se ainda não foi carregado."""
+        if self._alternatives is None:
+            if self._loader is None:
+                raise LookupError(f"Conteúdo da questão {self.id} não está disponível")
+            self._loader(self)
+            if self._alternatives is None:
+                raise LookupError(f"Questão {self.id} não encontrada no banco")
+    
+    @property
+    def context(self) -> Optional[str]:
+        self.load()
+        return self._context
+    
+    @property
+    def alternatives_introduction(self) -> Optional[str]:
+        self.load()
+        return self._alternatives_introduction
+    
+    @property
+    def alternatives(self) -> List[Alternative]:
+        self.load()
+        return self._alternatives
+    
+    @property
+    def files(self) -> List[str]:
+        self.load()
+        return self._files
+    
+    def __getitem__(self, key: str):
+        if key not in SUMMARY_FIELDS and key not in CONTENT_FIELDS and key != 'score':
+            raise KeyError(key)
+        return self.field_to_dict(key)
+    
+    def __repr__(self) -> str:
+        return f"Question(id={self.id}, year={self.year}, index={self.index})"
+    
+    def field_to_dict(self, key: str):
+        """Retorna um campo no formato usado pelos dicionários de questão."""
+        value = getattr(self, key)
+        if isinstance(value, Label):
+            return value._asdict()
+        if key == 'alternatives':
+            return [alternative.to_dict() for alternative in value]
+        if key == 'files':
+            return list(value)
+        return value
+    
+    def to_dict(self, include_content: Optional[bool] = None) -> Dict:
+        """
+        Converte a questão para dicionário.
+        
+        Args:
+            include_content: Se True, inclui (carregando se preciso) contexto, introdução, resposta,
+                alternativas e arquivos; se False, apenas o resumo. Por padrão, o conteúdo é incluído
+                somente se já foi carregado.
+        
+        Returns:
+            Dicionário com as mesmas chaves retornadas pelo visualizador antes dos registros
+        """
+        if include_content is None:
+            include_content = self.loaded
+        
+        if include_content:
+            keys = ('id', 'title', 'index', 'year', 'context', 'alternatives_introduction',
+                    'correct_alternative', 'discipline', 'language', 'alternatives', 'files')
+        else:
+            keys = SUMMARY_FIELDS
+        
+        question = {key: self.field_to_dict(key) for key in keys}
+        if self.score is not None:
+            question['score'] = self.score
+        return question
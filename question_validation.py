@@ -0,0 +1,140 @@
+"""
+Validação dos arquivos details.json das questões do ENEM antes da gravação no banco.
+
+Os validadores de cada campo são montados uma única vez, a partir dos esquemas abaixo. A validação
+percorre o arquivo inteiro e retorna todos os erros encontrados, em vez de parar no primeiro.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Versão das regras: arquivos em quarentena são validados novamente quando ela muda
+VALIDATION_VERSION = 2
+
+DISCIPLINES = {'ciencias-humanas', 'ciencias-natureza', 'linguagens', 'matematica'}
+LANGUAGES = {'espanhol', 'ingles'}
+LETTERS = {'A', 'B', 'C', 'D', 'E'}
+
+# Campo -> (tipo esperado, obrigatório e não nulo, valores permitidos)
+QUESTION_FIELDS = {
+    'title': (str, True, None),
+    'index': (int, True, None),
+    'year': (int, True, None),
+    'discipline': (str, True, DISCIPLINES),
+    'language': (str, False, LANGUAGES),
+    'context': (str, False, None),
+    'alternativesIntroduction': (str, False, None),
+    'correctAlternative': (str, True, LETTERS),
+    'files': (list, False, None),
+    'alternatives': (list, True, None),
+}
+
+ALTERNATIVE_FIELDS = {
+    'letter': (str, True, LETTERS),
+    # Alternativas só com imagem têm text nulo (ver validate_question)
+    'text': (str, False, None),
+    'file': (str, False, None),
+    'isCorrect': (bool, True, None),
+}
+
+TYPE_NAMES = {str: 'texto', int: 'inteiro', bool: 'booleano', list: 'lista'}
+
+Check = Callable[[Dict, str, List[str]], None]
+
+
+def compile_field(name: str, expected: type, required: bool, allowed: Optional[set]) -> Check:
+    """Cria o validador de um campo."""
+    type_name = TYPE_NAMES[expected]
+    
+    def check(record: Dict, prefix: str, errors: List[str]):
+        value = record.get(name)
+        if value is None:
+            if required:
+                state = 'nulo' if name in record else 'ausente'
+                errors.append(f"{prefix}{name}: {state} (esperado {type_name})")
+            return
+        
+        # bool é subclasse de int, mas true/false não é um índice válido
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            errors.append(f"{prefix}{name}: {type(value).__name__} (esperado {type_name})")
+        elif allowed is not None and value not in allowed:
+            errors.append(f"{prefix}{name}: valor inválido {value!r}")
+    
+    return check
+
+
+def compile_schema(fields: Dict[str, Tuple[type, bool, Optional[set]]]) -> List[Check]:
+    """Cria os validadores de todos os campos de um esquema."""
+    return [compile_field(name, *rule) for name, rule in fields.items()]
+
+
+_QUESTION_CHECKS = compile_schema(QUESTION_FIELDS)
+_ALTERNATIVE_CHECKS = compile_schema(ALTERNATIVE_FIELDS)
+
+
+def validate_question(data, year: Optional[int] = None, folder: Optional[str] = None) -> List[str]:
+    """
+    Valida o conteúdo de um details.json de questão.
+    
+    Args:
+        data: Conteúdo do arquivo já decodificado
+        year: Ano da pasta do arquivo (deve coincidir com o campo year)
+        folder: Nome da pasta da questão (ex.: '12' ou '1-ingles'), que deve coincidir com
+            os campos index e language
+    
+    Returns:
+        Lista com todos os erros encontrados (vazia se a questão é válida)
+    """
+    if not isinstance(data, dict):
+        return [f"conteúdo: {type(data).__name__} (esperado objeto)"]
+    
+    errors = []
+    for check in _QUESTION_CHECKS:
+        check(data, '', errors)
+    
+    files = data.get('files')
+    if isinstance(files, list):
+        for i, file_path in enumerate(files):
+            if not isinstance(file_path, str):
+                errors.append(f"files[{i}]: {type(file_path).__name__} (esperado texto)")
+    
+    alternatives = data.get('alternatives')
+    if isinstance(alternatives, list):
+        letters = []
+        correct = []
+        
+        for i, alternative in enumerate(alternatives):
+            if not isinstance(alternative, dict):
+                errors.append(f"alternatives[{i}]: {type(alternative).__name__} (esperado objeto)")
+                continue
+            
+            for check in _ALTERNATIVE_CHECKS:
+                check(alternative, f"alternatives[{i}].", errors)
+            
+            if alternative.get('text') is None and not alternative.get('file'):
+                errors.append(f"alternatives[{i}]: sem texto e sem arquivo")
+            
+            letters.append(alternative.get('letter'))
+            if alternative.get('isCorrect') is True:
+                correct.append(alternative.get('letter'))
+        
+        repeated = sorted({letter for letter in letters if letters.count(letter) > 1 and isinstance(letter, str)})
+        if repeated:
+            errors.append(f"alternatives: letras repetidas ({', '.join(repeated)})")
+        
+        if len(correct) != 1:
+            errors.append(f"alternatives: {len(correct)} alternativas corretas (esperada 1)")
+        elif data.get('correctAlternative') in LETTERS and correct[0] != data['correctAlternative']:
+            errors.append(f"correctAlternative: {data['correctAlternative']} difere da alternativa "
+                          f"marcada como correta ({correct[0]})")
+    
+    if year is not None and isinstance(data.get('year'), int) and data['year'] != year:
+        errors.append(f"year: {data['year']} difere da pasta do ano ({year})")
+    
+    if folder is not None:
+        index, _, language = folder.partition('-')
+        if index.isdigit() and isinstance(data.get('index'), int) and int(index) != data['index']:
+            errors.append(f"index: {data['index']} difere da pasta da questão ({folder})")
+        if (language or None) != data.get('language'):
+            errors.append(f"language: {data.get('language')!r} difere da pasta da questão ({folder})")
+    
+    return errors
@@ -0,0 +1,123 @@
+"""
+Índice de questões semelhantes ("mais como esta") para o banco de questões do ENEM.
+
+Cada questão é representada por um vetor TF-IDF esparso dos termos normalizados de contexto,
+introdução e alternativas. Os vizinhos mais próximos (similaridade de cosseno) são calculados
+com um índice invertido: o produto esparso só visita pares de questões que compartilham termos.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Termos presentes em mais que essa fração das questões não distinguem questões (ex.: "que", "para")
+MAX_DOCUMENT_FREQUENCY = 0.2
+
+# Termos presentes em menos questões que isso não aproximam nenhum par
+MIN_DOCUMENT_FREQUENCY = 2
+
+_MARKUP_PATTERN = re.compile(r'!\[[^\]]*\]\([^)]*\)|https?://\S+|www\.\S+')
+_TOKEN_PATTERN = re.compile(r'[a-z]{3,}')
+
+# Vetores e índice invertido compartilhados com os processos filhos
+_vectors = {}
+_postings = {}
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Converte o texto em termos minúsculos, sem acentos, imagens nem URLs."""
+    if not text:
+        return []
+    text = _MARKUP_PATTERN.sub(' ', text)
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _TOKEN_PATTERN.findall(text)
+
+
+def build_vectors(documents: Dict[int, str]) -> Dict[int, Dict[str, float]]:
+    """
+    Calcula os vetores TF-IDF normalizados de cada questão.
+    
+    Args:
+        documents: Dicionário ID da questão -> texto completo
+    
+    Returns:
+        Dicionário ID da questão -> {termo: peso}
+    """
+    counts = {question_id: Counter(tokenize(text)) for question_id, text in documents.items()}
+    total = len(counts)
+    
+    document_frequency = Counter(term for terms in counts.values() for term in terms)
+    idf = {
+        term: math.log(total / (1 + frequency)) + 1
+        for term, frequency in document_frequency.items()
+        if MIN_DOCUMENT_FREQUENCY <= frequency <= MAX_DOCUMENT_FREQUENCY * total
+    }
+    
+    vectors = {}
+    for question_id, terms in counts.items():
+        weights = {term: (1 + math.log(count)) * idf[term] for term, count in terms.items() if term in idf}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        vectors[question_id] = {term: weight / norm for term, weight in weights.items()}
+    
+    return vectors
+
+
+def _init_worker(vectors: Dict[int, Dict[str, float]], postings: Dict[str, List[Tuple[int, float]]]):
+    """Recebe os vetores e o índice invertido nos processos filhos."""
+    global _vectors, _postings
+    _vectors = vectors
+    _postings = postings
+
+
+def _nearest_neighbours(job: Tuple[List[int], int]) -> List[Tuple[int, List[Tuple[int, float]]]]:
+    """Calcula os k vizinhos mais próximos de um bloco de questões (executado em processos filhos)."""
+    question_ids, k = job
+    results = []
+    
+    for question_id in question_ids:
+        scores = defaultdict(float)
+        for term, weight in _vectors[question_id].items():
+            for other_id, other_weight in _postings[term]:
+                scores[other_id] += weight * other_weight
+        
+        scores.pop(question_id, None)
+        results.append((question_id, heapq.nlargest(k, scores.items(), key=lambda item: item[1])))
+    
+    return results
+
+
+def find_similar(documents: Dict[int, str], k: int = 10, max_workers: Optional[int] = None,
+                 chunk_size: int = 200) -> Iterable[Tuple[int, List[Tuple[int, float]]]]:
+    """
+    Calcula as k questões mais semelhantes a cada questão.
+    
+    Args:
+        documents: Dicionário ID da questão -> texto completo
+        k: Número de vizinhos por questão
+        max_workers: Número de processos (padrão: número de CPUs)
+        chunk_size: Número de questões por tarefa enviada aos processos
+    
+    Returns:
+        Pares (ID da questão, [(ID semelhante, similaridade), ...]) em ordem decrescente de similaridade
+    """
+    vectors = build_vectors(documents)
+    
+    postings = defaultdict(list)
+    for question_id, weights in vectors.items():
+        for term, weight in weights.items():
+            postings[term].append((question_id, weight))
+    postings = dict(postings)
+    
+    question_ids = list(vectors)
+    jobs = [(question_ids[start:start + chunk_size], k) for start in range(0, len(question_ids), chunk_size)]
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(vectors, postings)) as executor:
+        for results in executor.map(_nearest_neighbours, jobs):
+            yield from results
@@ -1,14 +1,49 @@
 import { Injectable } from '@nestjs/common';
+import { statSync } from 'fs';
 import { Database } from 'sqlite3';
 import { QuestionDto } from './dto/question.dto';
 import { FilterDto } from './dto/filter.dto';
 
+const DATABASE_PATH = 'enem_questions.db';
+
 @Injectable()
 export class EnemService {
   private db: Database;
+  private dbInode: number | null = null;
 
   constructor() {
-    this.db = new Database('enem_questions.db');
+    this.db = this.openDatabase();
+  }
+
+  private openDatabase(): Database {
+    this.dbInode = this.getDatabaseInode();
+    return new Database(DATABASE_PATH);
+  }
+
+  private getDatabaseInode(): number | null {
+    try {
+      return statSync(DATABASE_PATH).ino;
+    } catch {
+      return null;
+    }
+  }
+
+  // O banco está em modo WAL: a conexão aberta enxerga cada snapshot publicado e cada edição
+  // aplicada. Se o arquivo for substituído (ex.: restauração de uma cópia), a conexão antiga
+  // continuaria lendo o arquivo anterior, então o banco é reaberto quando o inode muda
+  private getDatabase(): Database {
+    const inode = this.getDatabaseInode();
+    if (inode !== null && inode !== this.dbInode) {
+      const previous = this.db;
+      this.db = this.openDatabase();
+      // Consultas já iniciadas terminam no snapshot anterior antes do fechamento
+      previous.close((err) => {
+        if (err) {
+          console.warn(`Erro ao fechar o snapshot anterior: ${err.message}`);
+        }
+      });
+    }
+    return this.db;
   }
 
   async getAllQuestions(filter: FilterDto): Promise<{
@@ -261,7 +296,7 @@ export class EnemService {
 
   private runQuery(query: string, params: any[]): Promise<any> {
     return new Promise((resolve, reject) => {
-      this.db.all(query, params, (err, rows) => {
+      this.getDatabase().all(query, params, (err, rows) => {
         if (err) {
           reject(err);
         } else {
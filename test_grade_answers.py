@@ -0,0 +1,160 @@
+"""
+Testes da leitura e conversão das folhas de respostas (grade_answers.py).
+
+Execute: python -m pytest test_grade_answers.py
+"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from extract_questions import EnemQuestionExtractor
+from grade_answers import BLANK, EnemAnswerGrader
+from view_questions import EnemQuestionViewer
+
+
+# Questões do banco de teste: (id, alternativa correta, disciplina)
+QUESTIONS = [
+    (1, 'A', 1),
+    (2, 'B', 1),
+    (3, 'C', 4),
+]
+
+
+@pytest.fixture
+def grader(tmp_path, monkeypatch):
+    """Corretor com um banco de três questões (gabarito A, B, C)."""
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "enem_questions.db")
+    
+    extractor = EnemQuestionExtractor(db_path)
+    extractor.create_database()
+    extractor.insert_disciplines_and_languages()
+    
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO questions (id, title, index_number, year, discipline_id, correct_alternative)
+        VALUES (?, ?, ?, 2023, ?, ?)
+    ''', [(question_id, f"Questão {question_id}", question_id, discipline_id, correct)
+          for question_id, correct, discipline_id in QUESTIONS])
+    conn.commit()
+    conn.close()
+    
+    return EnemAnswerGrader([1, 2, 3], EnemQuestionViewer(db_path))
+
+
+def read_csv(grader: EnemAnswerGrader, tmp_path, content: str):
+    """Grava o CSV e retorna todas as folhas lidas (IDs dos alunos e matriz de códigos)."""
+    path = tmp_path / "respostas.csv"
+    path.write_text(content, encoding='utf-8')
+    
+    student_ids = []
+    blocks = []
+    for ids, answers in grader.read_csv_chunks(str(path), chunk_size=2):
+        student_ids.extend(ids)
+        blocks.append(answers)
+    return student_ids, np.concatenate(blocks)
+
+
+def test_read_csv_grades_letters(grader, tmp_path):
+    student_ids, answers = read_csv(grader, tmp_path, "aluno,1,2,3\nana,A,B,C\nbia,a,c,E\n")
+    
+    assert student_ids == ['ana', 'bia']
+    assert grader.grade(answers)['totals'].tolist() == [3, 1]
+
+
+def test_read_csv_skips_blank_lines(grader, tmp_path):
+    student_ids, answers = read_csv(grader, tmp_path, "aluno,1,2,3\n\nana,A,B,C\n\n\nbia,B,B,B\n")
+    
+    assert student_ids == ['ana', 'bia']
+    assert grader.grade(answers)['totals'].tolist() == [3, 1]
+
+
+def test_read_csv_non_ascii_cells_count_as_blank(grader, tmp_path):
+    student_ids, answers = read_csv(grader, tmp_path, "aluno,1,2,3\njoão,É,B,ç\n")
+    
+    assert student_ids == ['joão']
+    assert answers.tolist() == [[BLANK, 1, BLANK]]
+
+
+def test_read_csv_short_rows_are_padded(grader, tmp_path):
+    student_ids, answers = read_csv(grader, tmp_path, "aluno,1,2,3\nana,A\nbia\ncaio,A,B,C,D\n")
+    
+    assert student_ids == ['ana', 'bia', 'caio']
+    assert answers.tolist() == [[0, BLANK, BLANK], [BLANK, BLANK, BLANK], [0, 1, 2]]
+
+
+def test_read_csv_maps_columns_by_header(grader, tmp_path):
+    # Colunas em outra ordem, questão desconhecida (99) e questão 2 ausente
+    _, answers = read_csv(grader, tmp_path, "aluno,3,99,1\nana,C,A,A\n")
+    
+    assert answers.tolist() == [[0, BLANK, 2]]
+
+
+def test_read_csv_invalid_cells_count_as_blank(grader, tmp_path):
+    _, answers = read_csv(grader, tmp_path, "aluno,1,2,3\nana,AB,F,\n")
+    
+    assert answers.tolist() == [[BLANK, BLANK, BLANK]]
+
+
+def test_encode_answers(grader):
+    answers = grader.encode_answers(["ABC", "aé", "", "ABCDE"])
+    
+    assert answers.tolist() == [[0, 1, 2], [0, BLANK, BLANK], [BLANK, BLANK, BLANK], [0, 1, 2]]
+
+
+def read_jsonl(grader: EnemAnswerGrader, tmp_path, lines: list):
+    """Grava o JSONL e retorna todas as folhas lidas (IDs dos alunos e matriz de códigos)."""
+    path = tmp_path / "respostas.jsonl"
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    
+    student_ids = []
+    blocks = []
+    for ids, answers in grader.read_jsonl_chunks(str(path), chunk_size=2):
+        student_ids.extend(ids)
+        blocks.append(answers)
+    return student_ids, np.concatenate(blocks)
+
+
+def test_read_jsonl_grades_letters(grader, tmp_path):
+    student_ids, answers = read_jsonl(grader, tmp_path, [
+        '{"student_id": "ana", "answers": {"1": "A", "2": "B", "3": "C"}}',
+        '{"student_id": "bia", "answers": {"3": "c", "1": "B"}}',
+    ])
+    
+    assert student_ids == ['ana', 'bia']
+    assert grader.grade(answers)['totals'].tolist() == [3, 1]
+
+
+def test_read_jsonl_ignores_unknown_keys(grader, tmp_path):
+    # Chave não numérica, questão fora do gabarito e número que int() não aceita
+    _, answers = read_jsonl(grader, tmp_path, [
+        '{"student_id": "ana", "answers": {"x": "B", "99": "A", "²": "A", " 2 ": "B"}}',
+    ])
+    
+    assert answers.tolist() == [[BLANK, 1, BLANK]]
+
+
+def test_read_jsonl_invalid_answers_count_as_blank(grader, tmp_path):
+    _, answers = read_jsonl(grader, tmp_path, [
+        '{"student_id": "ana", "answers": {"1": "AB", "2": 1, "3": "É"}}',
+        '{"student_id": "bia"}',
+        '{"student_id": "caio", "answers": ["A", "B", "C"]}',
+    ])
+    
+    assert answers.tolist() == [[BLANK, BLANK, BLANK]] * 3
+
+
+def test_read_jsonl_skips_blank_and_invalid_lines(grader, tmp_path):
+    student_ids, answers = read_jsonl(grader, tmp_path, [
+        '',
+        '["ana", "A"]',
+        '{"student_id": "ana", "answers": {"1": "A"}}',
+        '{"student_id": ',
+        '"texto"',
+        '{"student_id": 7, "answers": {"2": "B"}}',
+    ])
+    
+    assert student_ids == ['ana', '7']
+    assert answers.tolist() == [[0, BLANK, BLANK], [BLANK, 1, BLANK]]
@@ -0,0 +1,193 @@
+"""
+Testes da validação das questões (question_validation.py) e da quarentena do extrator.
+
+Execute: python -m pytest test_question_validation.py
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import extract_questions
+from extract_questions import EnemQuestionExtractor
+from question_validation import validate_question
+
+
+def make_question(**fields):
+    """Questão válida de 2023 (pasta '12'), com os campos informados substituídos."""
+    question = {
+        'title': "Questão 12 - ENEM 2023",
+        'index': 12,
+        'year': 2023,
+        'discipline': 'matematica',
+        'language': None,
+        'context': "Um terreno retangular...",
+        'alternativesIntroduction': "A área do terreno é",
+        'correctAlternative': 'B',
+        'files': [],
+        'alternatives': [
+            {'letter': letter, 'text': f"{i + 1}0 m²", 'file': None, 'isCorrect': letter == 'B'}
+            for i, letter in enumerate('ABCDE')
+        ],
+    }
+    question.update(fields)
+    return question
+
+
+def test_valid_question():
+    assert validate_question(make_question(), 2023, '12') == []
+
+
+def test_image_only_alternatives_are_valid():
+    question = make_question()
+    for alternative in question['alternatives']:
+        alternative['text'] = None
+        alternative['file'] = f"images/2023/12/{alternative['letter']}.png"
+    
+    assert validate_question(question, 2023, '12') == []
+
+
+def test_alternative_without_text_and_file():
+    question = make_question()
+    question['alternatives'][0]['text'] = None
+    
+    assert validate_question(question, 2023, '12') == ["alternatives[0]: sem texto e sem arquivo"]
+
+
+def test_multiple_correct_alternatives():
+    question = make_question()
+    question['alternatives'][3]['isCorrect'] = True
+    
+    assert validate_question(question) == ["alternatives: 2 alternativas corretas (esperada 1)"]
+
+
+def test_correct_alternative_differs_from_marked_one():
+    assert validate_question(make_question(correctAlternative='C')) == [
+        "correctAlternative: C difere da alternativa marcada como correta (B)"
+    ]
+
+
+def test_folder_mismatch():
+    errors = validate_question(make_question(language='ingles'), 2022, '13')
+    
+    assert errors == [
+        "year: 2023 difere da pasta do ano (2022)",
+        "index: 12 difere da pasta da questão (13)",
+        "language: 'ingles' difere da pasta da questão (13)",
+    ]
+
+
+def test_all_errors_are_reported():
+    question = make_question(title=None, index='12', discipline='fisica')
+    del question['year']
+    
+    assert validate_question(question) == [
+        "title: nulo (esperado texto)",
+        "index: str (esperado inteiro)",
+        "year: ausente (esperado inteiro)",
+        "discipline: valor inválido 'fisica'",
+    ]
+
+
+def test_non_object():
+    assert validate_question([1, 2]) == ["conteúdo: list (esperado objeto)"]
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """Extrator com banco vazio e uma pasta quiz-items de teste."""
+    monkeypatch.chdir(tmp_path)
+    extractor = EnemQuestionExtractor(str(tmp_path / "enem_questions.db"))
+    extractor.quiz_items_path = tmp_path / "quiz-items"
+    extractor.create_database()
+    extractor.insert_disciplines_and_languages()
+    return extractor
+
+
+def write_details(extractor: EnemQuestionExtractor, question: dict):
+    """Grava o details.json da questão em quiz-items/<ano>/questions/<índice>."""
+    folder = extractor.quiz_items_path / str(question['year']) / "questions" / str(question['index'])
+    folder.mkdir(parents=True, exist_ok=True)
+    details_file = folder / "details.json"
+    details_file.write_text(json.dumps(question, ensure_ascii=False), encoding='utf-8')
+    return details_file
+
+
+def test_quarantined_file_is_rechecked_after_rules_change(extractor, monkeypatch):
+    question = make_question()
+    question['alternatives'][0]['text'] = None
+    details_file = write_details(extractor, question)
+    
+    assert extractor.process_question_file(details_file) == ('quarantined', None)
+    # Arquivo sem alterações: não é lido novamente
+    assert extractor.process_question_file(details_file) == ('skipped', None)
+    
+    # Novas regras de validação: o arquivo é validado de novo (e continua inválido)
+    monkeypatch.setattr(extract_questions, 'VALIDATION_VERSION', extract_questions.VALIDATION_VERSION + 1)
+    assert extractor.process_question_file(details_file) == ('quarantined', None)
+    assert extractor.process_question_file(details_file) == ('skipped', None)
+    
+    # Corrigido, o arquivo é gravado e sai da quarentena
+    write_details(extractor, make_question())
+    status, question_id = extractor.process_question_file(details_file)
+    
+    assert status == 'applied'
+    assert extractor.load_quarantine() == {}
+    
+    conn = sqlite3.connect(extractor.db_path)
+    assert conn.execute('SELECT COUNT(*) FROM alternatives WHERE question_id = ?', (question_id,)).fetchone()[0] == 5
+    conn.close()
+
+
+def test_quarantine_removes_incomplete_row(extractor):
+    details_file = write_details(extractor, make_question())
+    _, question_id = extractor.process_question_file(details_file)
+    
+    # Linha sem alternativas, como as gravadas pela metade por versões antigas
+    conn = sqlite3.connect(extractor.db_path)
+    conn.execute('DELETE FROM alternatives WHERE question_id = ?', (question_id,))
+    conn.commit()
+    conn.close()
+    
+    write_details(extractor, make_question(correctAlternative='Z'))
+    assert extractor.process_question_file(details_file) == ('quarantined', None)
+    
+    conn = sqlite3.connect(extractor.db_path)
+    assert conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0] == 0
+    conn.close()
+
+
+def test_text_column_migration(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "antigo.db")
+    
+    # Esquema das versões antigas (text NOT NULL), com a tabela deixada por uma migração interrompida
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE alternatives (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question_id INTEGER NOT NULL,
+            letter TEXT NOT NULL,
+            text TEXT NOT NULL,
+            file_path TEXT,
+            is_correct BOOLEAN NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("INSERT INTO alternatives (question_id, letter, text, is_correct) VALUES (1, 'A', '10 m²', 1)")
+    conn.execute('CREATE TABLE alternatives_migration (id INTEGER)')
+    conn.commit()
+    conn.close()
+    
+    EnemQuestionExtractor(db_path).create_database()
+    
+    conn = sqlite3.connect(db_path)
+    columns = {row[1]: row[3] for row in conn.execute('PRAGMA table_info(alternatives)')}
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%migration%'")]
+    rows = conn.execute('SELECT letter, text, text_html FROM alternatives').fetchall()
+    conn.close()
+    
+    assert columns['text'] == 0
+    assert tables == []
+    assert rows == [('A', '10 m²', None)]
@@ -0,0 +1,146 @@
+"""
+Testes da renderização de markdown em HTML sanitizado (extract_questions.py).
+
+Execute: python -m pytest test_render_html.py
+"""
+
+import html
+import re
+import sqlite3
+
+import pytest
+
+from extract_questions import EnemQuestionExtractor, render_inline_markdown, render_markdown_html
+
+
+def attribute_values(rendered: str):
+    """Valores de href/src como o navegador os interpreta (entidades decodificadas)."""
+    return [html.unescape(value) for value in re.findall(r'(?:href|src)="([^"]*)"', rendered)]
+
+
+@pytest.mark.parametrize('markdown', [
+    '[clique](javascript:alert(1))',
+    '[clique](JaVaScRiPt:alert(1))',
+    '[clique](\x01javascript:alert(1))',
+    '[clique](vbscript:msgbox(1))',
+    '[clique](data:text/html;base64,PHNjcmlwdD4=)',
+    '![figura](javascript:alert(1))',
+    '![figura](data:image/svg+xml;base64,PHN2Zz4=)',
+    # Esquemas com entidades, decodificados por clientes que renderizem a URL novamente
+    '[clique](&#106;avascript:alert(1))',
+    '[clique](javascript&colon;alert(1))',
+    '[clique](&amp;#106;avascript:alert(1))',
+])
+def test_unsafe_urls_are_dropped(markdown):
+    rendered = render_inline_markdown(markdown)
+    
+    assert '<a' not in rendered and '<img' not in rendered
+    assert 'clique' in rendered or 'figura' in rendered
+
+
+def test_safe_links_and_images():
+    rendered = render_inline_markdown('[**fonte**](https://exemplo.com/a?x=1&y=2) ![mapa](images/2023/mapa.png)')
+    
+    assert rendered == (
+        '<a href="https://exemplo.com/a?x=1&amp;y=2" rel="noopener noreferrer"><strong>fonte</strong></a> '
+        '<img src="images/2023/mapa.png" alt="mapa">'
+    )
+    assert attribute_values(rendered) == ['https://exemplo.com/a?x=1&y=2', 'images/2023/mapa.png']
+
+
+def test_raw_html_is_escaped():
+    assert render_inline_markdown('<script>alert(1)</script> <img src=x onerror=alert(1)>') == (
+        '&lt;script&gt;alert(1)&lt;/script&gt; &lt;img src=x onerror=alert(1)&gt;'
+    )
+
+
+def test_attributes_cannot_be_closed():
+    rendered = render_inline_markdown('![a" onerror="alert(1)](x.png) [b](y.png"onclick="alert(1))')
+    
+    assert '" onerror="' not in rendered and '"onclick="' not in rendered
+    assert re.findall(r'<(\w+)', rendered) == ['img', 'a']
+
+
+def test_escaped_brackets_are_not_links():
+    assert render_inline_markdown('\\[texto\\](javascript:alert(1)) \\*literal\\*') == (
+        '[texto](javascript:alert(1)) *literal*'
+    )
+
+
+def test_nul_characters_are_removed():
+    # O NUL delimita os fragmentos guardados durante a renderização
+    assert render_inline_markdown('[a](https://a.com) \x000\x00 \x005\x00') == (
+        '<a href="https://a.com" rel="noopener noreferrer">a</a> 0 5'
+    )
+
+
+def test_markdown_blocks():
+    rendered = render_markdown_html('# Título\n\n> citação\n> <b>\n\n- um\n- *dois*\n\nlinha 1\nlinha 2')
+    
+    assert rendered == (
+        '<h1>Título</h1>\n'
+        '<blockquote><p>citação<br>\n&lt;b&gt;</p></blockquote>\n'
+        '<ul><li>um</li><li><em>dois</em></li></ul>\n'
+        '<p>linha 1<br>\nlinha 2</p>'
+    )
+    assert render_markdown_html(None) is None
+
+
+@pytest.fixture
+def extractor(tmp_path, monkeypatch):
+    """Extrator com banco vazio."""
+    monkeypatch.chdir(tmp_path)
+    extractor = EnemQuestionExtractor(str(tmp_path / "enem_questions.db"))
+    extractor.create_database()
+    extractor.insert_disciplines_and_languages()
+    return extractor
+
+
+QUESTION = {
+    'title': "Questão 1 - ENEM 2023",
+    'index': 1,
+    'year': 2023,
+    'discipline': 'matematica',
+    'context': "Texto com **destaque** e <script>",
+    'alternativesIntroduction': "Assinale",
+    'correctAlternative': 'A',
+    'files': [],
+    'alternatives': [
+        {'letter': letter, 'text': f"_{letter}_", 'file': None, 'isCorrect': letter == 'A'}
+        for letter in 'ABCDE'
+    ],
+}
+
+
+def read_html(extractor: EnemQuestionExtractor, question_id: int):
+    """HTML gravado do contexto e da primeira alternativa."""
+    conn = sqlite3.connect(extractor.db_path)
+    row = conn.execute('''
+        SELECT q.context_html, a.text_html
+        FROM questions q
+        JOIN alternatives a ON a.question_id = q.id
+        WHERE q.id = ?
+        ORDER BY a.letter
+    ''', (question_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def test_write_question_renders_inline(extractor):
+    question_id = extractor.write_question(QUESTION)
+    
+    assert read_html(extractor, question_id) == (
+        '<p>Texto com <strong>destaque</strong> e &lt;script&gt;</p>', '<p><em>A</em></p>'
+    )
+
+
+def test_full_extraction_renders_in_parallel_stage(extractor):
+    extractor.render_inline = False
+    question_id = extractor.write_question(QUESTION)
+    assert read_html(extractor, question_id) == (None, None)
+    
+    extractor.render_html_contents(max_workers=1)
+    
+    assert read_html(extractor, question_id) == (
+        '<p>Texto com <strong>destaque</strong> e &lt;script&gt;</p>', '<p><em>A</em></p>'
+    )
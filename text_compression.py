@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Compressão opcional dos textos longos do banco de questões do ENEM com zstd e dicionário treinado.
+
+O dicionário é treinado sobre os próprios textos do banco (contexto, introdução e alternativas, em
+markdown e no HTML pré-renderizado), que repetem muitos trechos como "Disponível em: ... Acesso em:
+...", e fica salvo no banco.
+Valores comprimidos são armazenados como BLOB na mesma coluna; textos não comprimidos
+continuam como TEXT, então a leitura distingue os dois pelo tipo.
+
+A API NestJS lê as colunas sem descomprimir, então o banco que ela serve nunca é comprimido: a
+compressão é feita em uma cópia lida apenas pelo EnemQuestionViewer (ver compress_copy).
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Iterable, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # dependência opcional
+    zstandard = None
+
+
+# Banco servido pela API NestJS (src/enem/enem.service.ts), que não pode ser comprimido
+API_DATABASE_PATH = "enem_questions.db"
+
+# Cópia comprimida padrão, lida apenas pelo visualizador Python
+COMPRESSED_DATABASE_PATH = "enem_questions.compressed.db"
+
+# Colunas comprimidas: (tabela, coluna)
+COMPRESSED_COLUMNS = [
+    ('questions', 'context'),
+    ('questions', 'alternatives_introduction'),
+    ('alternatives', 'text'),
+    ('questions', 'context_html'),
+    ('questions', 'alternatives_introduction_html'),
+    ('alternatives', 'text_html'),
+]
+
+
+class TextCompressor:
+    def __init__(self, dictionary: bytes, level: int = 19):
+        """
+        Inicializa o compressor a partir de um dicionário zstd.
+        
+        Args:
+            dictionary: Conteúdo do dicionário treinado
+            level: Nível de compressão do zstd
+        """
+        if zstandard is None:
+            raise RuntimeError("O pacote 'zstandard' é necessário para usar compressão (pip install zstandard)")
+        
+        self.dictionary = dictionary
+        self.level = level
+        dict_data = zstandard.ZstdCompressionDict(dictionary)
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+    
+    @classmethod
+    def train(cls, samples: Iterable[str], dict_size: int = 112640, level: int = 19) -> 'TextCompressor':
+        """Treina um dicionário zstd com os textos fornecidos."""
+        if zstandard is None:
+            raise RuntimeError("O pacote 'zstandard' é necessário para usar compressão (pip install zstandard)")
+        
+        encoded = [text.encode('utf-8') for text in samples if text]
+        dictionary = zstandard.train_dictionary(dict_size, encoded)
+        return cls(dictionary.as_bytes(), level)
+    
+    @classmethod
+    def load(cls, conn: sqlite3.Connection) -> Optional['TextCompressor']:
+        """Carrega o dicionário salvo no banco, ou retorna None se o banco não estiver comprimido."""
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name = 'compression_dictionaries'
+        ''')
+        if not cursor.fetchone():
+            return None
+        
+        cursor.execute('''
+            SELECT dictionary, level FROM compression_dictionaries
+            ORDER BY id DESC LIMIT 1
+        ''')
+        result = cursor.fetchone()
+        return cls(result[0], result[1]) if result else None
+    
+    def save(self, conn: sqlite3.Connection):
+        """Salva o dicionário no banco."""
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS compression_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                algorithm TEXT NOT NULL,
+                dictionary BLOB NOT NULL,
+                level INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO compression_dictionaries (algorithm, dictionary, level)
+            VALUES ('zstd', ?, ?)
+        ''', (self.dictionary, self.level))
+    
+    def compress(self, text: Optional[str]) -> Optional[bytes]:
+        """Comprime um texto."""
+        if text is None:
+            return None
+        return self._compressor.compress(text.encode('utf-8'))
+    
+    def decompress(self, value: Union[str, bytes, None]) -> Optional[str]:
+        """Descomprime um valor lido do banco; textos não comprimidos são retornados sem alteração."""
+        if isinstance(value, bytes):
+            return self._decompressor.decompress(value).decode('utf-8')
+        return value
+
+
+def decode_text(compressor: Optional[TextCompressor], value: Union[str, bytes, None]) -> Optional[str]:
+    """Descomprime o valor se necessário, usando o compressor informado."""
+    if isinstance(value, bytes):
+        if compressor is None:
+            raise RuntimeError("Valor comprimido encontrado, mas o banco não possui dicionário de compressão")
+        return compressor.decompress(value)
+    return value
+
+
+def compress_database(db_path: str, dict_size: int = 112640, level: int = 19):
+    """
+    Treina o dicionário e comprime as colunas de texto de um banco já extraído.
+    
+    Args:
+        db_path: Caminho para o banco de dados SQLite
+        dict_size: Tamanho máximo do dicionário em bytes
+        level: Nível de compressão do zstd
+    """
+    if os.path.abspath(db_path) == os.path.abspath(API_DATABASE_PATH):
+        raise ValueError(
+            f"{db_path} é servido pela API NestJS, que não lê textos comprimidos; "
+            f"comprima uma cópia com compress_copy (padrão: {COMPRESSED_DATABASE_PATH})"
+        )
+    
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    # Bancos já comprimidos reaproveitam o dicionário existente para os textos novos
+    compressor = TextCompressor.load(conn)
+    if compressor is None:
+        samples = []
+        for table, column in COMPRESSED_COLUMNS:
+            cursor.execute(f'SELECT {column} FROM {table} WHERE typeof({column}) = \'text\'')
+            samples.extend(row[0] for row in cursor.fetchall())
+        
+        compressor = TextCompressor.train(samples, dict_size, level)
+        compressor.save(conn)
+    
+    total = 0
+    for table, column in COMPRESSED_COLUMNS:
+        cursor.execute(f'SELECT id, {column} FROM {table} WHERE typeof({column}) = \'text\'')
+        rows = cursor.fetchall()
+        cursor.executemany(
+            f'UPDATE {table} SET {column} = ? WHERE id = ?',
+            [(compressor.compress(value), row_id) for row_id, value in rows]
+        )
+        total += len(rows)
+    
+    conn.commit()
+    cursor.execute('VACUUM')
+    conn.close()
+    
+    print(f"✅ Comprimidos {total} textos (dicionário de {len(compressor.dictionary)} bytes)")
+
+
+def compress_copy(db_path: str = API_DATABASE_PATH, output_path: str = COMPRESSED_DATABASE_PATH,
+                  dict_size: int = 112640, level: int = 19):
+    """
+    Grava uma cópia comprimida do banco, para ser lida apenas pelo EnemQuestionViewer.
+    
+    A cópia é montada em arquivo temporário e só então substitui a anterior. Ela não recebe as
+    edições do modo de observação: deve ser gerada novamente após cada publicação.
+    
+    Args:
+        db_path: Banco de origem (não é alterado)
+        output_path: Caminho da cópia comprimida
+        dict_size: Tamanho máximo do dicionário em bytes
+        level: Nível de compressão do zstd
+    """
+    if os.path.abspath(db_path) == os.path.abspath(output_path):
+        raise ValueError(f"A cópia comprimida precisa de um caminho diferente do banco de origem ({db_path})")
+    
+    tmp_path = f"{output_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(tmp_path)
+    source.backup(target)
+    source.close()
+    # A cópia é substituída com os.replace, que não é seguro para arquivos em modo WAL
+    target.execute('PRAGMA journal_mode = DELETE')
+    target.close()
+    
+    compress_database(tmp_path, dict_size, level)
+    os.replace(tmp_path, output_path)
+    print(f"✅ Cópia comprimida gravada em {output_path}")
+
+
+def decompress_database(db_path: str):
+    """Restaura as colunas de texto comprimidas e remove o dicionário do banco."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    
+    compressor = TextCompressor.load(conn)
+    if compressor is None:
+        conn.close()
+        print("⚠️  O banco não está comprimido")
+        return
+    
+    for table, column in COMPRESSED_COLUMNS:
+        cursor.execute(f'SELECT id, {column} FROM {table} WHERE typeof({column}) = \'blob\'')
+        rows = cursor.fetchall()
+        cursor.executemany(
+            f'UPDATE {table} SET {column} = ? WHERE id = ?',
+            [(compressor.decompress(value), row_id) for row_id, value in rows]
+        )
+    
+    cursor.execute('DROP TABLE compression_dictionaries')
+    conn.commit()
+    cursor.execute('VACUUM')
+    conn.close()
+    
+    print("✅ Textos descomprimidos")
+
+
+def benchmark(db_path: str = "enem_questions.db", dict_size: int = 112640, level: int = 19):
+    """
+    Mede a redução de tamanho do banco e o custo de descompressão por questão.
+    
+    O banco original não é alterado: a compressão é feita sobre uma cópia temporária.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        plain_path = os.path.join(tmp_dir, 'plain.db')
+        compressed_path = os.path.join(tmp_dir, 'compressed.db')
+        
+        shutil.copyfile(db_path, plain_path)
+        conn = sqlite3.connect(plain_path)
+        conn.execute('VACUUM')
+        conn.close()
+        shutil.copyfile(plain_path, compressed_path)
+        
+        compress_database(compressed_path, dict_size, level)
+        
+        plain_size = os.path.getsize(plain_path)
+        compressed_size = os.path.getsize(compressed_path)
+        
+        conn = sqlite3.connect(compressed_path)
+        compressor = TextCompressor.load(conn)
+        cursor = conn.cursor()
+        cursor.execute('SELECT q.context, q.alternatives_introduction FROM questions q')
+        questions = cursor.fetchall()
+        cursor.execute('SELECT text FROM alternatives')
+        alternatives = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        start = time.perf_counter()
+        for context, introduction in questions:
+            decode_text(compressor, context)
+            decode_text(compressor, introduction)
+        for text in alternatives:
+            decode_text(compressor, text)
+        elapsed = time.perf_counter() - start
+    
+    print("\n📊 BENCHMARK DE COMPRESSÃO")
+    print("=" * 50)
+    print(f"Banco original:    {plain_size / 1024:.0f} KiB")
+    print(f"Banco comprimido:  {compressed_size / 1024:.0f} KiB")
+    print(f"Redução:           {100 * (1 - compressed_size / plain_size):.1f}%")
+    print(f"Descompressão:     {1e6 * elapsed / max(len(questions), 1):.1f} µs por questão "
+          f"(contexto, introdução e alternativas)")
+
+
+def main():
+    """Função principal do script."""
+    import sys
+    
+    db_path = API_DATABASE_PATH
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "--compress":
+        # Ex.: python text_compression.py --compress enem_questions.compressed.db
+        compress_copy(db_path, sys.argv[2] if len(sys.argv) > 2 else COMPRESSED_DATABASE_PATH)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--decompress":
+        decompress_database(sys.argv[2] if len(sys.argv) > 2 else db_path)
+    else:
+        benchmark(db_path)
+
+
+if __name__ == "__main__":
+    main()
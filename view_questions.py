@@ -3,98 +3,400 @@
 Script para consultar e visualizar dados do banco de questões do ENEM.
 """
 
+import os
 import sqlite3
 import json
-from typing import List, Dict, Optional
+import random
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Union
+
+from columnar_export import EXPORT_BATCH_SIZE, PartitionedWriter, export_schemas
+from query_tracing import QueryTracer, traced
+from question_records import QUESTION_COLUMNS, Alternative, Question
+from text_compression import TextCompressor, decode_text
+
+
+# Limite padrão do SQLite para bancos anexados a uma mesma conexão (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED_SHARDS = 10
+
+# Tabelas com dados de cada ano, unidas entre os shards anexados
+SHARDED_TABLES = ['exams', 'questions', 'alternatives', 'question_files']
+
+# Tabelas de referência, idênticas em todos os shards
+SHARED_TABLES = ['disciplines', 'languages']
+
+# Máximo de IDs por consulta IN ao carregar o conteúdo das questões em lote
+MAX_QUERY_IDS = 500
 
 
 class EnemQuestionViewer:
-    def __init__(self, db_path: str = "enem_questions.db"):
+    def __init__(self, db_path: str = "enem_questions.db", shards_path: Optional[str] = None,
+                 tracer: Optional[QueryTracer] = None):
         """
         Inicializa o visualizador de questões do ENEM.
         
         Args:
             db_path: Caminho para o arquivo do banco de dados SQLite
+            shards_path: Pasta com os shards anuais e o catalog.db (gerados por
+                `extract_questions.py --sharded`). Quando informada, substitui o db_path.
+            tracer: Coletor opcional de métricas e consultas lentas (ver query_tracing.py)
         """
         self.db_path = db_path
+        self.shards_path = Path(shards_path) if shards_path else None
+        self.tracer = tracer
+        # Dicionário de compressão (carregado apenas se houver textos comprimidos)
+        self._compressor = None
+        # Identificação do arquivo publicado (inode e data de modificação) e sua versão
+        self._snapshot = None
+        self.snapshot_version = None
     
-    def get_question_by_id(self, question_id: int) -> Optional[Dict]:
-        """Busca uma questão pelo ID."""
-        conn = sqlite3.connect(self.db_path)
+    def check_snapshot(self) -> Optional[int]:
+        """
+        Detecta se um novo snapshot foi publicado no db_path e descarta os caches do anterior.
+        
+        A verificação custa dois os.stat (o banco e o arquivo -wal, que recebe as escritas no modo
+        WAL); o banco só é aberto quando um deles mudou. Consultas em andamento não são afetadas,
+        pois cada uma lê um snapshot consistente do banco.
+        
+        Returns:
+            Versão do snapshot atual (PRAGMA user_version gravado por publish_snapshot)
+        """
+        if self.shards_path is not None:
+            return None
+        
+        try:
+            stat = os.stat(self.db_path)
+        except FileNotFoundError:
+            return self.snapshot_version
+        
+        try:
+            wal_stat = os.stat(f"{self.db_path}-wal")
+            wal = (wal_stat.st_mtime_ns, wal_stat.st_size)
+        except FileNotFoundError:
+            wal = None
+        
+        snapshot = (stat.st_ino, stat.st_mtime_ns, wal)
+        if snapshot != self._snapshot:
+            conn = sqlite3.connect(self.db_path)
+            self.snapshot_version = conn.execute('PRAGMA user_version').fetchone()[0]
+            conn.close()
+            self._compressor = None
+            self._snapshot = snapshot
+        
+        return self.snapshot_version
+    
+    def get_shard_files(self, year: Optional[int] = None, question_id: Optional[int] = None) -> List[str]:
+        """
+        Lista, do ano mais recente para o mais antigo, os shards que podem conter os dados pedidos.
+        
+        Args:
+            year: Restringe ao shard do ano
+            question_id: Restringe ao shard cuja faixa de IDs contém a questão
+        """
+        catalog = sqlite3.connect(self.shards_path / "catalog.db")
+        
+        query = 'SELECT file_path FROM shards WHERE 1=1'
+        params = []
+        
+        if year:
+            query += ' AND year = ?'
+            params.append(year)
+        
+        if question_id is not None:
+            query += ' AND ? BETWEEN min_question_id AND max_question_id'
+            params.append(question_id)
+        
+        query += ' ORDER BY year DESC'
+        
+        files = [str(self.shards_path / row[0]) for row in catalog.execute(query, params)]
+        catalog.close()
+        return files
+    
+    def connect_shards(self, shard_files: List[str]) -> sqlite3.Connection:
+        """
+        Abre uma conexão que enxerga os shards informados como um único banco.
+        
+        Um único shard é aberto diretamente; vários são anexados (ATTACH) a um banco em memória
+        com views temporárias que unem as tabelas de mesmo nome.
+        """
+        if len(shard_files) == 1:
+            return sqlite3.connect(shard_files[0])
+        
+        conn = sqlite3.connect(":memory:")
+        for i, shard_file in enumerate(shard_files):
+            conn.execute(f'ATTACH DATABASE ? AS shard{i}', (shard_file,))
+        
+        for table in SHARDED_TABLES:
+            union = ' UNION ALL '.join(f'SELECT * FROM shard{i}.{table}' for i in range(len(shard_files)))
+            conn.execute(f'CREATE TEMP VIEW {table} AS {union}')
+        
+        for table in SHARED_TABLES:
+            conn.execute(f'CREATE TEMP VIEW {table} AS SELECT * FROM shard0.{table}')
+        
+        return conn
+    
+    def iter_connections(self, year: Optional[int] = None,
+                         question_id: Optional[int] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Gera as conexões necessárias para consultar os dados pedidos.
+        
+        Sem shards, gera apenas a conexão com o db_path. Com shards, a consulta é roteada para o
+        shard do ano (ou da questão) quando possível; caso contrário os shards são anexados em grupos
+        de até MAX_ATTACHED_SHARDS, do ano mais recente para o mais antigo.
+        """
+        if self.shards_path is None:
+            self.check_snapshot()
+            conn = sqlite3.connect(self.db_path)
+            if self.tracer is not None:
+                self.tracer.instrument(conn)
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+        
+        shard_files = self.get_shard_files(year, question_id)
+        for start in range(0, len(shard_files), MAX_ATTACHED_SHARDS):
+            conn = self.connect_shards(shard_files[start:start + MAX_ATTACHED_SHARDS])
+            if self.tracer is not None:
+                self.tracer.instrument(conn)
+            try:
+                yield conn
+            finally:
+                conn.close()
+    
+    def decode_text(self, conn: sqlite3.Connection, value: Union[str, bytes, None]) -> Optional[str]:
+        """Retorna o texto de uma coluna, descomprimindo-o se o banco estiver comprimido."""
+        if isinstance(value, bytes) and self._compressor is None:
+            self._compressor = TextCompressor.load(conn)
+        return decode_text(self._compressor, value)
+    
+    def get_content_columns(self, format: str) -> Dict[str, str]:
+        """
+        Retorna as colunas de conteúdo correspondentes ao formato pedido.
+        
+        Args:
+            format: 'markdown' (texto original) ou 'html' (pré-renderizado pelo extrator)
+        """
+        if format == "markdown":
+            return {'context': 'q.context', 'introduction': 'q.alternatives_introduction', 'text': 'text'}
+        if format == "html":
+            return {'context': 'q.context_html', 'introduction': 'q.alternatives_introduction_html', 'text': 'text_html'}
+        raise ValueError(f"Formato inválido: {format} (use 'markdown' ou 'html')")
+    
+    @traced
+    def get_question_by_id(self, question_id: int, format: str = "markdown") -> Optional[Question]:
+        """
+        Busca uma questão pelo ID, já com o conteúdo carregado.
+        
+        Args:
+            question_id: ID da questão
+            format: Formato do conteúdo ('markdown' ou 'html')
+        """
+        columns = self.get_content_columns(format)
+        
+        for conn in self.iter_connections(question_id=question_id):
+            question = self.fetch_question(conn, question_id, columns)
+            if question:
+                return question
+        return None
+    
+    def fetch_question(self, conn: sqlite3.Connection, question_id: int,
+                       columns: Dict[str, str]) -> Optional[Question]:
+        """Lê uma questão completa (com alternativas e arquivos) de uma conexão já aberta."""
         cursor = conn.cursor()
+        cursor.row_factory = Question.from_row
         
-        cursor.execute('''
-            SELECT 
-                q.id, q.title, q.index_number, q.year, q.context,
-                q.alternatives_introduction, q.correct_alternative,
-                d.label as discipline_label, d.value as discipline_value,
-                l.label as language_label, l.value as language_value
+        cursor.execute(f'''
+            SELECT {QUESTION_COLUMNS}
             FROM questions q
             LEFT JOIN disciplines d ON q.discipline_id = d.id
             LEFT JOIN languages l ON q.language_id = l.id
             WHERE q.id = ?
         ''', (question_id,))
         
-        result = cursor.fetchone()
+        question = cursor.fetchone()
         
-        if not result:
-            conn.close()
-            return None
+        if question:
+            self.fetch_contents(conn, {question.id: question}, columns)
         
-        question = {
-            'id': result[0],
-            'title': result[1],
-            'index': result[2],
-            'year': result[3],
-            'context': result[4],
-            'alternatives_introduction': result[5],
-            'correct_alternative': result[6],
-            'discipline': {
-                'label': result[7],
-                'value': result[8]
-            },
-            'language': {
-                'label': result[9],
-                'value': result[10]
-            } if result[9] else None
-        }
+        return question
+    
+    def fetch_contents(self, conn: sqlite3.Connection, questions: Dict[int, Question],
+                       columns: Dict[str, str]) -> int:
+        """
+        Carrega, com consultas em lote, o contexto, as alternativas e os arquivos das questões.
         
-        # Buscar alternativas
-        cursor.execute('''
-            SELECT letter, text, file_path, is_correct
-            FROM alternatives
-            WHERE question_id = ?
-            ORDER BY letter
-        ''', (question_id,))
+        Args:
+            conn: Conexão já aberta
+            questions: Dicionário ID -> questão a carregar
+            columns: Colunas de conteúdo (ver get_content_columns)
         
-        alternatives = []
-        for alt in cursor.fetchall():
-            alternatives.append({
-                'letter': alt[0],
-                'text': alt[1],
-                'file': alt[2],
-                'is_correct': bool(alt[3])
-            })
-        
-        question['alternatives'] = alternatives
-        
-        # Buscar arquivos
-        cursor.execute('''
-            SELECT file_path
-            FROM question_files
-            WHERE question_id = ?
-        ''', (question_id,))
+        Returns:
+            Número de questões encontradas na conexão
+        """
+        cursor = conn.cursor()
+        question_ids = list(questions)
+        found = 0
+        
+        for start in range(0, len(question_ids), MAX_QUERY_IDS):
+            chunk = question_ids[start:start + MAX_QUERY_IDS]
+            placeholders = ', '.join('?' for _ in chunk)
+            
+            cursor.execute(f'''
+                SELECT q.id, {columns['context']}, {columns['introduction']}
+                FROM questions q
+                WHERE q.id IN ({placeholders})
+            ''', chunk)
+            texts = {row[0]: row[1:] for row in cursor.fetchall()}
+            
+            if not texts:
+                continue
+            
+            alternatives = {question_id: [] for question_id in texts}
+            files = {question_id: [] for question_id in texts}
+            
+            # Buscar alternativas
+            cursor.execute(f'''
+                SELECT question_id, letter, {columns['text']}, file_path, is_correct
+                FROM alternatives
+                WHERE question_id IN ({placeholders})
+                ORDER BY question_id, letter
+            ''', chunk)
+            
+            for question_id, letter, text, file_path, is_correct in cursor.fetchall():
+                alternatives[question_id].append(
+                    Alternative(letter, self.decode_text(conn, text), file_path, bool(is_correct))
+                )
+            
+            # Buscar arquivos
+            cursor.execute(f'''
+                SELECT question_id, file_path
+                FROM question_files
+                WHERE question_id IN ({placeholders})
+            ''', chunk)
+            
+            for question_id, file_path in cursor.fetchall():
+                files[question_id].append(file_path)
+            
+            for question_id, (context, introduction) in texts.items():
+                questions[question_id].set_content(
+                    self.decode_text(conn, context),
+                    self.decode_text(conn, introduction),
+                    alternatives[question_id],
+                    files[question_id]
+                )
+            found += len(texts)
+        
+        return found
+    
+    def make_loader(self, questions: List[Question], format: str = "markdown"):
+        """
+        Associa às questões um carregador preguiçoso compartilhado.
         
-        files = [row[0] for row in cursor.fetchall()]
-        question['files'] = files
+        O primeiro acesso ao conteúdo de qualquer questão da lista carrega, em lote, o conteúdo de
+        todas as que ainda não foram carregadas. O conteúdo precisa vir do mesmo snapshot em que a
+        lista foi consultada: se outro snapshot foi publicado (ou uma edição aplicada) desde então,
+        o acesso levanta LookupError e a consulta deve ser refeita.
+        """
+        # Valida o formato antes de adiar o carregamento
+        self.get_content_columns(format)
         
-        conn.close()
-        return question
+        # Versão do snapshot lido pela consulta (shards não têm versão)
+        version = self.snapshot_version if self.shards_path is None else None
+        
+        def load(_question: Question):
+            self.load_contents(questions, format, version)
+        
+        for question in questions:
+            question.set_loader(load)
+        
+        return questions
     
+    @traced
+    def load_contents(self, questions: List[Question], format: str = "markdown",
+                      version: Optional[int] = None) -> List[Question]:
+        """
+        Carrega em lote o conteúdo das questões da lista que ainda não foram carregadas.
+        
+        Args:
+            questions: Questões a carregar
+            format: Formato do conteúdo ('markdown' ou 'html')
+            version: Versão do snapshot em que as questões foram consultadas; se o banco estiver em
+                outra versão, levanta LookupError em vez de misturar dados de snapshots diferentes
+        """
+        columns = self.get_content_columns(format)
+        
+        pending = {question.id: question for question in questions if not question.loaded}
+        for conn in self.iter_connections():
+            if not pending:
+                break
+            
+            if version is not None:
+                # A versão e o conteúdo são lidos na mesma transação (mesmo snapshot)
+                conn.execute('BEGIN')
+                current = conn.execute('PRAGMA user_version').fetchone()[0]
+                if current != version:
+                    raise LookupError(
+                        f"O snapshot {version} em que as questões foram consultadas foi substituído "
+                        f"pelo {current}; refaça a consulta"
+                    )
+            
+            self.fetch_contents(conn, pending, columns)
+            pending = {question_id: question for question_id, question in pending.items() if not question.loaded}
+        
+        return questions
+    
+    @traced
+    def get_questions_by_ids(self, question_ids: List[int], format: str = "markdown") -> List[Question]:
+        """
+        Busca várias questões completas de uma vez, com consultas em lote por banco.
+        
+        Args:
+            question_ids: IDs das questões
+            format: Formato do conteúdo ('markdown' ou 'html')
+        
+        Returns:
+            Questões encontradas, na mesma ordem de question_ids
+        """
+        columns = self.get_content_columns(format)
+        if not question_ids:
+            return []
+        
+        placeholders = ', '.join('?' for _ in question_ids)
+        questions = {}
+        
+        for conn in self.iter_connections():
+            cursor = conn.cursor()
+            cursor.row_factory = Question.from_row
+            
+            cursor.execute(f'''
+                SELECT {QUESTION_COLUMNS}
+                FROM questions q
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                LEFT JOIN languages l ON q.language_id = l.id
+                WHERE q.id IN ({placeholders})
+            ''', question_ids)
+            
+            found = {question.id: question for question in cursor.fetchall()}
+            
+            if not found:
+                continue
+            
+            self.fetch_contents(conn, found, columns)
+            
+            questions.update(found)
+            if len(questions) == len(set(question_ids)):
+                break
+        
+        return [questions[question_id] for question_id in question_ids if question_id in questions]
+    
+    @traced
     def search_questions(self, year: Optional[int] = None, 
                         discipline: Optional[str] = None,
                         language: Optional[str] = None,
-                        limit: int = 10) -> List[Dict]:
+                        limit: int = 10,
+                        format: str = "markdown") -> List[Question]:
         """
         Busca questões com filtros.
         
@@ -103,18 +405,13 @@ class EnemQuestionViewer:
             discipline: Valor da disciplina
             language: Valor do idioma
             limit: Limite de resultados
+            format: Formato do conteúdo, carregado apenas quando acessado ('markdown' ou 'html')
             
         Returns:
             Lista de questões
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        query = '''
-            SELECT 
-                q.id, q.title, q.index_number, q.year,
-                d.label as discipline_label, d.value as discipline_value,
-                l.label as language_label, l.value as language_value
+        query = f'''
+            SELECT {QUESTION_COLUMNS}
             FROM questions q
             LEFT JOIN disciplines d ON q.discipline_id = d.id
             LEFT JOIN languages l ON q.language_id = l.id
@@ -136,38 +433,113 @@ class EnemQuestionViewer:
             params.append(language)
         
         query += ' ORDER BY q.year DESC, q.index_number ASC LIMIT ?'
-        params.append(limit)
         
-        cursor.execute(query, params)
+        # Os bancos são percorridos do ano mais recente para o mais antigo, mantendo a ordenação
+        questions = []
+        for conn in self.iter_connections(year=year):
+            cursor = conn.cursor()
+            cursor.row_factory = Question.from_row
+            cursor.execute(query, params + [limit - len(questions)])
+            questions.extend(cursor.fetchall())
+            
+            if len(questions) >= limit:
+                break
+        
+        return self.make_loader(questions, format)
+    
+    @traced
+    def get_similar(self, question_id: int, k: int = 5, format: str = "markdown") -> List[Question]:
+        """
+        Retorna as questões mais semelhantes a uma questão, a partir do índice gerado pelo extrator.
+        
+        Args:
+            question_id: ID da questão de referência
+            k: Número de questões semelhantes
+            format: Formato do conteúdo, carregado apenas quando acessado ('markdown' ou 'html')
+        
+        Returns:
+            Lista de questões (mesmo formato de search_questions) com a similaridade em score
+        """
+        if self.shards_path is not None:
+            return self.get_similar_sharded(question_id, k, format)
         
         questions = []
-        for row in cursor.fetchall():
-            questions.append({
-                'id': row[0],
-                'title': row[1],
-                'index': row[2],
-                'year': row[3],
-                'discipline': {
-                    'label': row[4],
-                    'value': row[5]
-                },
-                'language': {
-                    'label': row[6],
-                    'value': row[7]
-                } if row[6] else None
-            })
-        
-        conn.close()
-        return questions
+        for conn in self.iter_connections(question_id=question_id):
+            cursor = conn.cursor()
+            cursor.row_factory = Question.from_row
+            cursor.execute(f'''
+                SELECT {QUESTION_COLUMNS}, s.score
+                FROM similar_questions s
+                JOIN questions q ON s.similar_question_id = q.id
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                LEFT JOIN languages l ON q.language_id = l.id
+                WHERE s.question_id = ?
+                ORDER BY s.rank
+                LIMIT ?
+            ''', (question_id, k))
+            questions.extend(cursor.fetchall())
+        
+        return self.make_loader(questions, format)
+    
+    def get_similar_sharded(self, question_id: int, k: int, format: str) -> List[Question]:
+        """Lê as semelhantes no índice do catalog.db (calculado sobre todos os anos) e busca as questões nos shards."""
+        catalog = sqlite3.connect(self.shards_path / "catalog.db")
+        has_index = catalog.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'similar_questions'"
+        ).fetchone()
+        if not has_index:
+            catalog.close()
+            raise RuntimeError(
+                f"Índice de questões semelhantes não encontrado em {self.shards_path / 'catalog.db'} "
+                f"(gere os shards novamente com `python extract_questions.py --sharded`)"
+            )
+        
+        neighbours = catalog.execute('''
+            SELECT similar_question_id, score
+            FROM similar_questions
+            WHERE question_id = ?
+            ORDER BY rank
+            LIMIT ?
+        ''', (question_id, k)).fetchall()
+        catalog.close()
+        
+        if not neighbours:
+            return []
+        
+        scores = dict(neighbours)
+        placeholders = ', '.join('?' for _ in scores)
+        found = {}
+        for conn in self.iter_connections():
+            cursor = conn.cursor()
+            cursor.row_factory = Question.from_row
+            cursor.execute(f'''
+                SELECT {QUESTION_COLUMNS}
+                FROM questions q
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                LEFT JOIN languages l ON q.language_id = l.id
+                WHERE q.id IN ({placeholders})
+            ''', list(scores))
+            found.update((question.id, question) for question in cursor.fetchall())
+            
+            if len(found) == len(scores):
+                break
+        
+        questions = []
+        for similar_id, score in neighbours:
+            if similar_id in found:
+                found[similar_id].score = score
+                questions.append(found[similar_id])
+        
+        return self.make_loader(questions, format)
     
+    @traced
     def get_random_question(self, year: Optional[int] = None,
-                           discipline: Optional[str] = None) -> Optional[Dict]:
+                           discipline: Optional[str] = None,
+                           format: str = "markdown") -> Optional[Question]:
         """Retorna uma questão aleatória."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        # O total de questões de cada banco pondera o sorteio entre shards
         query = '''
-            SELECT q.id
+            SELECT q.id, COUNT(*) OVER ()
             FROM questions q
             LEFT JOIN disciplines d ON q.discipline_id = d.id
             WHERE 1=1
@@ -185,28 +557,32 @@ class EnemQuestionViewer:
         
         query += ' ORDER BY RANDOM() LIMIT 1'
         
-        cursor.execute(query, params)
-        result = cursor.fetchone()
-        
-        conn.close()
-        
-        if result:
-            return self.get_question_by_id(result[0])
+        candidates = []
+        for conn in self.iter_connections(year=year):
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            result = cursor.fetchone()
+            if result:
+                candidates.append(result)
+        
+        if candidates:
+            question_id = random.choices(
+                [candidate[0] for candidate in candidates],
+                weights=[candidate[1] for candidate in candidates]
+            )[0]
+            return self.get_question_by_id(question_id, format=format)
         return None
     
+    @traced
     def export_questions_to_json(self, filename: str = "enem_questions_export.json",
                                 year: Optional[int] = None,
-                                discipline: Optional[str] = None):
+                                discipline: Optional[str] = None,
+                                format: str = "markdown"):
         """Exporta questões para um arquivo JSON."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        columns = self.get_content_columns(format)
         
-        query = '''
-            SELECT 
-                q.id, q.title, q.index_number, q.year, q.context,
-                q.alternatives_introduction, q.correct_alternative,
-                d.label as discipline_label, d.value as discipline_value,
-                l.label as language_label, l.value as language_value
+        query = f'''
+            SELECT {QUESTION_COLUMNS}
             FROM questions q
             LEFT JOIN disciplines d ON q.discipline_id = d.id
             LEFT JOIN languages l ON q.language_id = l.id
@@ -225,61 +601,15 @@ class EnemQuestionViewer:
         
         query += ' ORDER BY q.year DESC, q.index_number ASC'
         
-        cursor.execute(query, params)
-        
         questions = []
-        for row in cursor.fetchall():
-            question_id = row[0]
-            
-            # Buscar alternativas
-            cursor.execute('''
-                SELECT letter, text, file_path, is_correct
-                FROM alternatives
-                WHERE question_id = ?
-                ORDER BY letter
-            ''', (question_id,))
+        for conn in self.iter_connections(year=year):
+            cursor = conn.cursor()
+            cursor.row_factory = Question.from_row
+            cursor.execute(query, params)
             
-            alternatives = []
-            for alt in cursor.fetchall():
-                alternatives.append({
-                    'letter': alt[0],
-                    'text': alt[1],
-                    'file': alt[2],
-                    'is_correct': bool(alt[3])
-                })
-            
-            # Buscar arquivos
-            cursor.execute('''
-                SELECT file_path
-                FROM question_files
-                WHERE question_id = ?
-            ''', (question_id,))
-            
-            files = [f[0] for f in cursor.fetchall()]
-            
-            question = {
-                'id': row[0],
-                'title': row[1],
-                'index': row[2],
-                'year': row[3],
-                'context': row[4],
-                'alternatives_introduction': row[5],
-                'correct_alternative': row[6],
-                'discipline': {
-                    'label': row[7],
-                    'value': row[8]
-                },
-                'language': {
-                    'label': row[9],
-                    'value': row[10]
-                } if row[9] else None,
-                'alternatives': alternatives,
-                'files': files
-            }
-            
-            questions.append(question)
-        
-        conn.close()
+            found = cursor.fetchall()
+            self.fetch_contents(conn, {question.id: question for question in found}, columns)
+            questions.extend(question.to_dict() for question in found)
         
         # Salvar em arquivo JSON
         with open(filename, 'w', encoding='utf-8') as f:
@@ -287,39 +617,144 @@ class EnemQuestionViewer:
         
         print(f"✅ Exportadas {len(questions)} questões para {filename}")
     
-    def print_question(self, question: Dict):
+    @traced
+    def export_questions_to_parquet(self, output_path: str = "enem_questions_parquet",
+                                    year: Optional[int] = None,
+                                    discipline: Optional[str] = None,
+                                    format: str = "markdown",
+                                    file_format: str = "parquet",
+                                    batch_size: int = EXPORT_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Exporta questões, alternativas e arquivos como tabelas colunares para análises.
+        
+        Cada tabela é gravada em output_path/<tabela>, particionada por ano e disciplina
+        (year=<ano>/discipline=<disciplina>), em lotes lidos diretamente do cursor.
+        
+        Args:
+            output_path: Pasta da exportação
+            year: Ano das questões exportadas
+            discipline: Valor da disciplina das questões exportadas
+            format: Formato do conteúdo ('markdown' ou 'html')
+            file_format: 'parquet' ou 'arrow' (Arrow IPC)
+            batch_size: Número de linhas por lote
+        
+        Returns:
+            Número de linhas gravadas por tabela
+        """
+        columns = self.get_content_columns(format)
+        schemas = export_schemas()
+        
+        filters = ''
+        params = []
+        
+        if year:
+            filters += ' AND q.year = ?'
+            params.append(year)
+        
+        if discipline:
+            filters += ' AND d.value = ?'
+            params.append(discipline)
+        
+        queries = {
+            'questions': f'''
+                SELECT
+                    q.year, d.value, q.id, q.index_number, q.title, l.value,
+                    {columns['context']}, {columns['introduction']}, q.correct_alternative
+                FROM questions q
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                LEFT JOIN languages l ON q.language_id = l.id
+                WHERE 1=1 {filters}
+                ORDER BY q.year, d.value, q.index_number
+            ''',
+            'alternatives': f'''
+                SELECT q.year, d.value, a.question_id, a.letter, a.{columns['text']}, a.file_path, a.is_correct
+                FROM alternatives a
+                JOIN questions q ON a.question_id = q.id
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                WHERE 1=1 {filters}
+                ORDER BY q.year, d.value, a.question_id, a.letter
+            ''',
+            'files': f'''
+                SELECT q.year, d.value, f.question_id, f.file_path
+                FROM question_files f
+                JOIN questions q ON f.question_id = q.id
+                LEFT JOIN disciplines d ON q.discipline_id = d.id
+                WHERE 1=1 {filters}
+                ORDER BY q.year, d.value, f.question_id
+            ''',
+        }
+        
+        # Colunas de texto (possivelmente comprimidas) de cada consulta
+        text_columns = {'questions': (6, 7), 'alternatives': (4,), 'files': ()}
+        
+        writers = {
+            table: PartitionedWriter(output_path, table, schemas[table], file_format, batch_size)
+            for table in queries
+        }
+        
+        try:
+            for conn in self.iter_connections(year=year):
+                for table, query in queries.items():
+                    cursor = conn.cursor()
+                    cursor.execute(query, params)
+                    
+                    rows = cursor
+                    if text_columns[table] and TextCompressor.load(conn) is not None:
+                        rows = (self.decode_row(conn, row, text_columns[table]) for row in cursor)
+                    
+                    writers[table].write_rows(rows)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        
+        counts = {table: writer.rows for table, writer in writers.items()}
+        print(f"✅ Exportadas {counts['questions']} questões, {counts['alternatives']} alternativas e "
+              f"{counts['files']} arquivos para {output_path}")
+        return counts
+    
+    def decode_row(self, conn: sqlite3.Connection, row: tuple, text_columns: tuple) -> tuple:
+        """Descomprime as colunas de texto indicadas de uma linha."""
+        row = list(row)
+        for column in text_columns:
+            row[column] = self.decode_text(conn, row[column])
+        return tuple(row)
+    
+    def print_question(self, question: Question):
         """Imprime uma questão formatada."""
         print(f"\n{'='*60}")
-        print(f"📝 {question['title']}")
-        print(f"📅 Ano: {question['year']} | 📊 Questão: {question['index']}")
-        print(f"📚 Disciplina: {question['discipline']['label']}")
+        print(f"📝 {question.title}")
+        print(f"📅 Ano: {question.year} | 📊 Questão: {question.index}")
+        print(f"📚 Disciplina: {question.discipline.label}")
         
-        if question['language']:
-            print(f"🌐 Idioma: {question['language']['label']}")
+        if question.language:
+            print(f"🌐 Idioma: {question.language.label}")
         
-        if question['context']:
+        if question.context:
             print(f"\n📖 Contexto:")
-            print(question['context'])
+            print(question.context)
         
-        if question['alternatives_introduction']:
-            print(f"\n❓ {question['alternatives_introduction']}")
+        if question.alternatives_introduction:
+            print(f"\n❓ {question.alternatives_introduction}")
         
         print(f"\n📋 Alternativas:")
-        for alt in question['alternatives']:
-            marker = "✅" if alt['is_correct'] else "  "
-            print(f"{marker} {alt['letter']}) {alt['text']}")
+        for alt in question.alternatives:
+            marker = "✅" if alt.is_correct else "  "
+            print(f"{marker} {alt.letter}) {alt.text if alt.text is not None else f'[imagem: {alt.file}]'}")
         
-        print(f"\n🎯 Resposta correta: {question['correct_alternative']}")
+        print(f"\n🎯 Resposta correta: {question.correct_alternative}")
         
-        if question['files']:
-            print(f"\n📎 Arquivos: {', '.join(question['files'])}")
+        if question.files:
+            print(f"\n📎 Arquivos: {', '.join(question.files)}")
         
         print(f"{'='*60}")
 
-
 def main():
     """Função principal para demonstrar o uso do visualizador."""
-    viewer = EnemQuestionViewer()
+    import sys
+    
+    # --trace: mede as consultas e exibe as métricas no formato do Prometheus ao final
+    tracer = QueryTracer(slow_query_ms=50) if "--trace" in sys.argv[1:] else None
+    viewer = EnemQuestionViewer(tracer=tracer)
     
     print("🔍 VISUALIZADOR DE QUESTÕES DO ENEM")
     print("=" * 50)
@@ -328,12 +763,12 @@ def main():
     print("\n1. Buscando questões de 2023:")
     questions_2023 = viewer.search_questions(year=2023, limit=3)
     for q in questions_2023:
-        print(f"  - {q['title']} ({q['discipline']['label']})")
+        print(f"  - {q.title} ({q.discipline.label})")
     
     print("\n2. Buscando questões de matemática:")
     math_questions = viewer.search_questions(discipline="matematica", limit=3)
     for q in math_questions:
-        print(f"  - {q['title']} ({q['year']})")
+        print(f"  - {q.title} ({q.year})")
     
     print("\n3. Questão aleatória:")
     random_question = viewer.get_random_question()
@@ -342,6 +777,10 @@ def main():
     
     print("\n4. Exportando questões de 2023 para JSON:")
     viewer.export_questions_to_json("enem_2023.json", year=2023)
+    
+    if tracer:
+        print("\n📊 Métricas das consultas:")
+        print(tracer.to_prometheus())
 
 
 if __name__ == "__main__":
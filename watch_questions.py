@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Modo de observação do extrator: aplica continuamente no banco as edições feitas em quiz-items.
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import inotify_simple
+except ImportError:  # dependência opcional; sem ela o diretório é verificado periodicamente
+    inotify_simple = None
+
+from extract_questions import EnemQuestionExtractor
+
+
+# Tempo sem novos eventos antes de aplicar as edições pendentes (segundos)
+DEBOUNCE_SECONDS = 0.2
+
+# Tempo máximo que uma edição espera durante uma rajada contínua de eventos (segundos)
+MAX_BATCH_DELAY = 0.8
+
+# Intervalo entre verificações do diretório quando o inotify não está disponível (segundos)
+POLL_INTERVAL = 0.25
+
+# Número de latências recentes usadas no relatório de saúde
+LATENCY_WINDOW = 1000
+
+if inotify_simple is not None:
+    WATCH_FLAGS = (inotify_simple.flags.CREATE | inotify_simple.flags.CLOSE_WRITE |
+                   inotify_simple.flags.MOVED_TO | inotify_simple.flags.MOVED_FROM |
+                   inotify_simple.flags.DELETE)
+
+
+class QuestionWatcher:
+    def __init__(self, extractor: Optional[EnemQuestionExtractor] = None, use_inotify: bool = True,
+                 debounce: float = DEBOUNCE_SECONDS, poll_interval: float = POLL_INTERVAL):
+        """
+        Inicializa o observador de edições.
+        
+        Args:
+            extractor: Extrator usado para aplicar as edições (padrão: enem_questions.db)
+            use_inotify: Se False, usa sempre a verificação periódica do diretório
+            debounce: Tempo sem novos eventos antes de aplicar as edições pendentes (segundos)
+            poll_interval: Intervalo entre verificações no modo sem inotify (segundos)
+        """
+        self.extractor = extractor or EnemQuestionExtractor()
+        # Garante que o banco tem o esquema atual antes da primeira edição
+        self.extractor.create_database()
+        self.extractor.insert_disciplines_and_languages()
+        self.root = self.extractor.quiz_items_path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        
+        # Arquivos alterados aguardando aplicação -> momento em que a alteração foi detectada
+        self.pending = {}
+        self.last_event = 0.0
+        
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.applied = 0
+        self.errors = 0
+        self.quarantined = 0
+        self.last_applied_at = None
+        
+        self._inotify = None
+        self._watches = {}
+        self._files = {}
+        
+        if use_inotify and inotify_simple is not None:
+            try:
+                self._inotify = inotify_simple.INotify()
+                self.add_watches(self.root)
+            except OSError as e:
+                # Ex.: limite de fs.inotify.max_user_watches atingido
+                print(f"⚠️  inotify indisponível ({e}), usando verificação periódica")
+                self._inotify = None
+        
+        if self._inotify is None:
+            self._files = self.scan()
+        
+        self.mode = "inotify" if self._inotify is not None else "polling"
+    
+    def add_watches(self, directory: Path):
+        """Observa um diretório e todos os seus subdiretórios."""
+        for path, _, _ in os.walk(directory):
+            wd = self._inotify.add_watch(path, WATCH_FLAGS)
+            self._watches[wd] = Path(path)
+    
+    def scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Lista os details.json de exames e questões com (mtime, tamanho)."""
+        files = {}
+        
+        for year_entry in os.scandir(self.root):
+            if not (year_entry.is_dir() and year_entry.name.isdigit()):
+                continue
+            
+            paths = [Path(year_entry.path) / "details.json"]
+            try:
+                with os.scandir(Path(year_entry.path) / "questions") as entries:
+                    paths.extend(Path(entry.path) / "details.json" for entry in entries if entry.is_dir())
+            except FileNotFoundError:
+                pass
+            
+            for path in paths:
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+        
+        return files
+    
+    def collect(self, timeout: float):
+        """Aguarda até timeout segundos por alterações e as adiciona às pendentes."""
+        changed = []
+        
+        if self._inotify is not None:
+            for event in self._inotify.read(timeout=int(timeout * 1000)):
+                if event.mask & inotify_simple.flags.IGNORED:
+                    self._watches.pop(event.wd, None)
+                    continue
+                
+                directory = self._watches.get(event.wd)
+                if directory is None:
+                    continue
+                
+                path = directory / event.name
+                if event.mask & inotify_simple.flags.ISDIR:
+                    if event.mask & (inotify_simple.flags.CREATE | inotify_simple.flags.MOVED_TO):
+                        # Pastas novas (ou movidas para cá) passam a ser observadas com todo o conteúdo
+                        self.add_watches(path)
+                        changed.extend(path.rglob("details.json"))
+                    else:
+                        changed.append(path / "details.json")
+                elif event.name == "details.json":
+                    changed.append(path)
+        else:
+            time.sleep(timeout)
+            files = self.scan()
+            changed = [path for path, signature in files.items() if self._files.get(path) != signature]
+            changed.extend(path for path in self._files if path not in files)
+            self._files = files
+        
+        if changed:
+            now = time.time()
+            self.last_event = now
+            for path in changed:
+                self.pending.setdefault(path, now)
+    
+    def apply(self, batch: Dict[Path, float]):
+        """
+        Aplica no banco as edições de um lote de arquivos, uma questão por transação.
+        
+        Durante a publicação de um snapshot (write_lock), o lote espera e é aplicado sobre o novo
+        snapshot, para que nenhuma edição se perca.
+        """
+        with self.extractor.write_lock():
+            self.extractor.load_compressor()
+            
+            for path, detected_at in sorted(batch.items()):
+                try:
+                    if path.parent == self.root / path.parent.name:
+                        # details.json do exame: quiz-items/<ano>/details.json
+                        if not path.exists():
+                            continue
+                        self.extractor.apply_exam_file(int(path.parent.name))
+                        description = f"exame {path.parent.name}"
+                    elif path.parent.parent.name == "questions":
+                        # details.json da questão: quiz-items/<ano>/questions/<pasta>/details.json
+                        year = int(path.parent.parent.parent.name)
+                        if path.exists():
+                            # Arquivos inválidos (inclusive salvos pela metade) vão para a quarentena e a
+                            # versão anterior da questão continua no banco até a próxima edição
+                            status, question_id = self.extractor.process_question_file(path)
+                            if status == 'skipped':
+                                continue
+                            if status == 'quarantined':
+                                self.quarantined += 1
+                                continue
+                            description = f"questão {path.parent.name} de {year} (ID {question_id})"
+                        else:
+                            self.extractor.release_file(str(path))
+                            if not self.extractor.remove_question(year, path.parent.name):
+                                continue
+                            description = f"questão {path.parent.name} de {year} removida"
+                    else:
+                        continue
+                    
+                    # Latência desde a gravação do arquivo (ou desde a detecção, para remoções)
+                    edited_at = path.stat().st_mtime if path.exists() else detected_at
+                    latency = time.time() - edited_at
+                    
+                    self.latencies.append(latency)
+                    self.applied += 1
+                    self.last_applied_at = time.time()
+                    print(f"✅ Aplicada {description} em {latency * 1000:.0f} ms")
+                
+                except Exception as e:
+                    # Erros de leitura ou de gravação são tentados de novo no próximo evento
+                    self.errors += 1
+                    print(f"❌ Erro ao aplicar {path}: {e}")
+    
+    def health(self) -> Dict:
+        """
+        Resume o estado do observador.
+        
+        Returns:
+            Modo, contadores, edições pendentes e latência edição→visível (ms) das últimas aplicações
+        """
+        latencies = sorted(self.latencies)
+        
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(1000 * latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 1)
+        
+        return {
+            'mode': self.mode,
+            'applied': self.applied,
+            'errors': self.errors,
+            'quarantined': self.quarantined,
+            'pending': len(self.pending),
+            'last_applied_at': self.last_applied_at,
+            'latency_ms': {
+                'last': round(1000 * self.latencies[-1], 1) if self.latencies else None,
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': percentile(1.0),
+            },
+        }
+    
+    def print_health(self):
+        """Exibe o relatório de saúde."""
+        health = self.health()
+        latency = health['latency_ms']
+        print(f"📊 [{health['mode']}] {health['applied']} edições aplicadas, {health['errors']} erros, "
+              f"{health['quarantined']} em quarentena, {health['pending']} pendentes")
+        if latency['last'] is not None:
+            print(f"   Latência edição→visível: p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                  f"máx {latency['max']} ms")
+    
+    def run(self, duration: Optional[float] = None, health_interval: float = 60.0):
+        """
+        Observa quiz-items e aplica as edições até ser interrompido.
+        
+        Args:
+            duration: Tempo máximo de execução em segundos (padrão: sem limite)
+            health_interval: Intervalo entre relatórios de saúde (segundos)
+        """
+        print(f"👀 Observando {self.root} ({self.mode}); Ctrl+C para encerrar")
+        started = time.time()
+        next_health = started + health_interval
+        
+        try:
+            while duration is None or time.time() - started < duration:
+                self.collect(self.debounce / 2 if self.pending else self.poll_interval)
+                
+                now = time.time()
+                if self.pending and (now - self.last_event >= self.debounce or
+                                     now - min(self.pending.values()) >= MAX_BATCH_DELAY):
+                    batch, self.pending = self.pending, {}
+                    self.apply(batch)
+                
+                if now >= next_health:
+                    self.print_health()
+                    next_health = now + health_interval
+        except KeyboardInterrupt:
+            pass
+        
+        self.print_health()
+
+
+def main():
+    """Função principal do script."""
+    import sys
+    
+    if "--help" in sys.argv[1:]:
+        print("Uso: python watch_questions.py [--poll]")
+        print("  --poll  Verifica o diretório periodicamente em vez de usar inotify")
+        return
+    
+    watcher = QuestionWatcher(use_inotify="--poll" not in sys.argv[1:])
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()